@@ -1,6 +1,4 @@
-import time
 import pytmx
-import random
 import pygame
 from typing import Literal
 from pytmx.util_pygame import load_pygame
@@ -8,16 +6,25 @@ from pygame import Vector2, Surface
 from pygame.mixer import Channel
 from pygame.sprite import RenderUpdates, GroupSingle
 
+from src.Units.base_unit import Unit
 from src.Units.player import Player
 from src.Units.ghosts import QGhost, GhostParameters
+from src.Units.ghost_engine import GhostMovementEngine
 from src.Units.trap import Trap
+from src.Units.position import GridPosition
 from src.Units.splitter import GhostSplitter
 from src.Score.score import ScoreSystem
+from src.Levels.clock import LevelClock, RealTimeClock
+from src.Levels.collision_grid import CollisionGrid
+from src.Levels.flow_field import FlowFields
+from src.Levels.routing_table import RoutingTable
+from src.Levels.visibility import VisibilityTable
 from src.Levels.level_hud import BaseLevelHud
-from src.Levels.utils import generate_random_positions
+from src.Levels.utils import SpawnCells
+from src.random_numbers import rng
 from src.user_interfaces import GameUserInterface
 from src.SoundEffects.sound_manager import LevelSoundManager
-from src.settings import MAX_GHOSTS_PER_STATE
+from src.settings import MAX_GHOSTS_PER_STATE, GHOST_FLOW_FIELDS
 
 
 class BaseLevel:
@@ -33,9 +40,23 @@ class BaseLevel:
         ghost_parameters: GhostParameters = None,
         score_system: ScoreSystem = None,
         difficulty: int = 3,
+        user_interface: GameUserInterface = None,
+        headless: bool = False,
+        clock: LevelClock = None,
     ):
+        """
+        :param user_interface: where the commands of the player come from, the keyboard
+            if not given
+        :param headless: the level is only simulated: the map images aren't loaded,
+            there is no window and the level must not be rendered
+        :param clock: time of the level, the real time if not given
+        """
         self.keep_running = True
-        self.user_interface = GameUserInterface()
+        self.user_interface = (
+            GameUserInterface() if user_interface is None else user_interface
+        )
+        self.headless = headless
+        self.clock = RealTimeClock() if clock is None else clock
         self.window = window
         self.surface: pygame.Surface = None
         self.level_title: str = "Level"
@@ -52,6 +73,8 @@ class BaseLevel:
         self.level_name: str = None
         self.tmx_map: pytmx.TileMap = None
         self.tmx_data = None
+        self.collision_grid: CollisionGrid = None
+        self.visibility: VisibilityTable = None
 
         self.music_path: str = None
         self.background_sound_path: str = None
@@ -63,7 +86,8 @@ class BaseLevel:
 
         self.base_level_hud: BaseLevelHud = None
 
-        # ghost-splitters
+        # ghost-splitters, by position
+        self.splitters: dict[GridPosition, GhostSplitter] = {}
         self.splitter_group: RenderUpdates = RenderUpdates()
 
         # player and ghosts
@@ -75,8 +99,12 @@ class BaseLevel:
         self.ghost_parameters = ghost_parameters
         self.ghosts_group: [QGhost] = None
         self.visible_ghosts_group: RenderUpdates = RenderUpdates()
+        self.ghost_engine: GhostMovementEngine = None
+        self.flow_fields: FlowFields = None
+        self.spawn_cells: SpawnCells = None
 
-        self.traps: [Trap] = []
+        # traps by position, updated as they are laid and consumed
+        self.traps: dict[GridPosition, Trap] = {}
         self.traps_group = RenderUpdates()
 
         self.hud_render_group: RenderUpdates = RenderUpdates()
@@ -86,10 +114,14 @@ class BaseLevel:
         self.level_score: int = 0
 
     def update(self):
+        self.clock.tick()
+        rng.new_tick()
+        for unit in self.moving_units():
+            unit.save_previous_position()
         self.keep_running = self.user_interface.process_input()
 
         # visible ghost actions
-        self.visible_ghosts_group.update(self._player)
+        self.ghost_engine.step(self._player)
 
         # player actions
         self.player_group.update(
@@ -110,12 +142,16 @@ class BaseLevel:
         for qghost in self.ghosts_group:
             qghost.update(self._player, self.traps)
             if not qghost.is_alive:
+                for ghost in qghost.visible_parts:
+                    self.ghost_engine.remove(ghost)
                 self.ghosts_group.remove(qghost)
                 self._player.qghosts_killed += 1
             alive_ghosts += qghost.visible_parts
-        self.visible_ghosts_group.remove([ghost for ghost in self.visible_ghosts_group if ghost not in alive_ghosts])
+        self.visible_ghosts_group.remove(
+            [ghost for ghost in self.visible_ghosts_group if ghost not in alive_ghosts]
+        )
 
-        self.traps_group.add(self.traps)
+        self.traps_group.add(self.traps.values())
         self.clean_traps()
 
         self.base_level_hud.update()
@@ -135,14 +171,23 @@ class BaseLevel:
             qghosts_killed=self._player.qghosts_killed,
             level_difficulty=self.difficulty,
             max_ghosts_per_state=MAX_GHOSTS_PER_STATE,
-            total_level_time=time.time() - self.level_start_time,
+            total_level_time=self.clock.now() - self.level_start_time,
         )
         if self.game_status == "won":
             self.music.play_game_won_sound()
         else:
             self.music.play_game_over_sound()
 
-    def render(self):
+    def moving_units(self) -> list[Unit]:
+        return [*self.player_group, *self.visible_ghosts_group, *self.shots_group]
+
+    def render(self, alpha: float = 1.0):
+        """
+        :param alpha: fraction of the next tick already elapsed, the moving units are
+            drawn this far between their positions of the last two ticks
+        """
+        for unit in self.moving_units():
+            unit.interpolate(alpha)
         self.window.blit(self.surface, (0, 0))
         if self.traps:
             self.traps_group.draw(self.window)
@@ -162,10 +207,17 @@ class BaseLevel:
 
     def load_map(self):
         self.tmx_map = pytmx.TiledMap(self.level_name)
-        self.tmx_data = load_pygame(self.level_name)
+        if self.headless:
+            self.tmx_data = self.tmx_map
+        else:
+            self.tmx_data = load_pygame(self.level_name)
 
         self.cellSize = Vector2(self.tmx_data.tilewidth, self.tmx_data.tileheight)
         self.worldSize = Vector2(self.tmx_data.width, self.tmx_data.height)
+        self.collision_grid = CollisionGrid.from_tmx(self.tmx_data)
+        self.visibility = VisibilityTable(collision_grid=self.collision_grid)
+        if self.headless:
+            return
 
         windowSize = self.worldSize.elementwise() * self.cellSize
         self.window = pygame.display.set_mode((int(windowSize.x), int(windowSize.y)))
@@ -187,26 +239,42 @@ class BaseLevel:
                         )
 
     def load_units(self):
-        splitters = [
-            GhostSplitter(
+        self.spawn_cells = SpawnCells(
+            collision_grid=self.collision_grid,
+            player_position=self.player_initial_position,
+        )
+        for position in self.spawn_cells.take(self.num_splitters):
+            splitter = GhostSplitter(
                 cellSize=self.cellSize,
                 worldSize=self.worldSize,
-                position=generate_random_positions(worldSize=self.worldSize),
-                splitterType=random.choice(self.splitter_types),
+                position=position,
+                splitterType=rng.choice(self.splitter_types),
             )
-            for _ in range(self.num_splitters)
-        ]
+            self.splitters[splitter.position] = splitter
+
+        if GHOST_FLOW_FIELDS:
+            self.flow_fields = FlowFields(
+                collision_grid=self.collision_grid,
+                routing_table=RoutingTable.for_map(
+                    self.level_name, self.collision_grid.grid == 0
+                ),
+            )
+        self.ghost_engine = GhostMovementEngine(
+            worldSize=self.worldSize,
+            splitters=self.splitters,
+            flow_fields=self.flow_fields,
+            visibility=self.visibility,
+        )
 
         self._player = Player(
             cellSize=self.cellSize,
             worldSize=self.worldSize,
             position=self.player_initial_position,
             channel=self.player_channel,
-            map_data=self.tmx_data,
-            splitters=splitters,
-            does_map_have_tile_dont_pass=True
-            if "TileDontPass" in self.tmx_data.layernames
-            else False,
+            collision_grid=self.collision_grid,
+            splitters=self.splitters,
+            visibility=self.visibility,
+            clock=self.clock,
         )
         self.player_group.add(self._player)
 
@@ -217,19 +285,17 @@ class BaseLevel:
             QGhost(
                 cellSize=self.cellSize,
                 worldSize=self.worldSize,
-                position=generate_random_positions(
-                    worldSize=self.worldSize,
-                    player_position=self.player_initial_position,
-                ),
-                splitters=splitters,
+                position=position,
+                splitters=self.splitters,
                 render_group=self.visible_ghosts_group,
                 channel=self.enemies_channel,
                 ghost_parameters=self.ghost_parameters,
+                ghost_engine=self.ghost_engine,
             )
-            for _ in range(self.num_ghosts)
+            for position in self.spawn_cells.take(self.num_ghosts)
         ]
 
-        self.splitter_group.add(splitters)
+        self.splitter_group.add(self.splitters.values())
 
         self.base_level_hud = BaseLevelHud(cellSize=self.cellSize, player=self._player)
         self.hud_render_group.add(self.base_level_hud.player_data_hud.hearts)
@@ -248,12 +314,12 @@ class BaseLevel:
         self.load_map()
         self.load_units()
         self.music.play_music()
-        self.level_start_time = time.time()
+        self.level_start_time = self.clock.now()
 
     def clean_traps(self):
-        for trap in self.traps:
+        for position, trap in list(self.traps.items()):
             if not trap.is_alive:
                 self.traps_group.remove(trap)
-                self.traps.remove(trap)
+                del self.traps[position]
         # add new ones
-        self.traps_group.add(self.traps)
+        self.traps_group.add(self.traps.values())
@@ -0,0 +1,48 @@
+import time
+
+from src.settings import TICKS_PER_SECOND
+
+
+class LevelClock:
+    """
+    The time of a level, in seconds since the clock was created. Everything timed in
+    a level, such as the measure cooldown or the level time of the score, reads it
+    instead of the wall clock, so that simulations may run faster than real time.
+    """
+
+    def tick(self) -> None:
+        """
+        Called at the start of every update of the level.
+        """
+
+    def now(self) -> float:
+        raise NotImplementedError
+
+
+class RealTimeClock(LevelClock):
+    """
+    Time as it passes for the player, from a monotonic clock.
+    """
+
+    def __init__(self):
+        self.start = time.monotonic()
+
+    def now(self) -> float:
+        return time.monotonic() - self.start
+
+
+class SimulationClock(LevelClock):
+    """
+    Time counted in ticks, each of them lasting 1 / ticks_per_second seconds however
+    fast the level is updated.
+    """
+
+    def __init__(self, ticks_per_second: int = TICKS_PER_SECOND):
+        self.ticks_per_second = ticks_per_second
+        self.ticks = 0
+
+    def tick(self) -> None:
+        self.ticks += 1
+
+    def now(self) -> float:
+        return self.ticks / self.ticks_per_second
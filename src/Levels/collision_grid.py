@@ -0,0 +1,68 @@
+from typing import Optional
+
+import numpy as np
+from pygame import Vector2
+from pytmx import TiledMap
+
+from src.Units.position import GridPosition
+
+# bits of the collision grid, one per blocking layer of the TMX maps
+WALL = 1
+DONT_PASS = 2
+COLLISION_LAYERS = {"Walls": WALL, "TileDontPass": DONT_PASS}
+
+
+def shift(grids: np.ndarray, move: tuple[int, int], fill: int) -> np.ndarray:
+    """
+    shifted[..., y, x] = grids[..., y + move.y, x + move.x], fill outside the grids.
+    """
+    dx, dy = move
+    height, width = grids.shape[-2:]
+    shifted = np.full_like(grids, fill)
+    shifted[
+        ..., max(0, -dy) : height - max(0, dy), max(0, -dx) : width - max(0, dx)
+    ] = grids[..., max(0, dy) : height + min(0, dy), max(0, dx) : width + min(0, dx)]
+    return shifted
+
+
+class CollisionGrid:
+    """
+    Blocking tiles of a map as a grid of bitmasks indexed by cell, grid[y, x],
+    built once when the map is loaded so that collision checks are array lookups.
+    """
+
+    def __init__(self, worldSize: Vector2 = None):
+        """
+        :param worldSize: size of the map (in units of cells)
+        """
+        self.grid = np.zeros((int(worldSize.y), int(worldSize.x)), dtype=np.uint8)
+
+    @classmethod
+    def from_tmx(cls, tmx_data: TiledMap) -> "CollisionGrid":
+        collision_grid = cls(worldSize=Vector2(tmx_data.width, tmx_data.height))
+        for layer_name, mask in COLLISION_LAYERS.items():
+            if layer_name in tmx_data.layernames:
+                collision_grid.add_layer(tmx_data.layernames[layer_name], mask)
+        return collision_grid
+
+    def add_layer(self, layer, mask: int) -> None:
+        for x, y, _ in layer.tiles():
+            self.grid[y, x] |= mask
+
+    def cell(self, position: GridPosition) -> Optional[tuple[int, int]]:
+        """
+        :return: the (x, y) cell the position is on, None if it lies between cells or out of the map
+        """
+        if position.cell is None:
+            return None
+        x, y = position.cell
+        if not (0 <= x < self.grid.shape[1] and 0 <= y < self.grid.shape[0]):
+            return None
+        return x, y
+
+    def collides(self, position: GridPosition, mask: int = WALL | DONT_PASS) -> bool:
+        cell = self.cell(position)
+        if cell is None:
+            return False
+        x, y = cell
+        return bool(self.grid[y, x] & mask)
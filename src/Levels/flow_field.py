@@ -0,0 +1,132 @@
+from typing import Optional, TYPE_CHECKING
+
+import numpy as np
+
+from src.Levels.collision_grid import CollisionGrid
+from src.Units.position import GridPosition
+
+if TYPE_CHECKING:
+    from src.Levels.routing_table import RoutingTable
+
+# the moves between neighbouring cells, as in DIR_DICT
+NEIGHBOUR_MOVES = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])
+
+
+def bfs_distances(walkable: np.ndarray, target: tuple[int, int]) -> np.ndarray:
+    """
+    Number of steps from every cell to the target, walking only on walkable cells.
+
+    :param walkable: boolean grid indexed as walkable[y, x]
+    :param target: (x, y) cell
+    :return: grid of distances, -1 for the cells from which the target can't be reached
+    """
+    return bfs_distances_to_all(walkable, [target])[0]
+
+
+def bfs_distances_to_all(
+    walkable: np.ndarray, targets: list[tuple[int, int]]
+) -> np.ndarray:
+    """
+    bfs_distances for several targets at once. The BFS grows the frontiers of all
+    the targets together with array shifts.
+
+    :return: array of shape (number of targets, height, width)
+    """
+    distances = np.full((len(targets),) + walkable.shape, -1, dtype=np.int32)
+    frontier = np.zeros(distances.shape, dtype=bool)
+    for k, (x, y) in enumerate(targets):
+        if walkable[y, x]:
+            distances[k, y, x] = 0
+            frontier[k, y, x] = True
+    distance = 0
+    while frontier.any():
+        distance += 1
+        grown = np.zeros_like(frontier)
+        grown[:, 1:, :] |= frontier[:, :-1, :]
+        grown[:, :-1, :] |= frontier[:, 1:, :]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        frontier = grown & walkable & (distances < 0)
+        distances[frontier] = distance
+    return distances
+
+
+class FlowField:
+    """
+    BFS distances to one target cell. Any number of units find their next step
+    towards (or away from) the target by looking at the distances of their neighbours.
+    """
+
+    def __init__(self, walkable: np.ndarray, target: tuple[int, int]):
+        self.target = target
+        self.distances = bfs_distances(walkable, target)
+
+    def steps(
+        self, positions: np.ndarray, uniforms: np.ndarray, away: np.ndarray = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Next step of each unit, down the distances or up them for the units going away.
+        Ties between neighbours are broken with the uniforms.
+
+        :param positions: integer (x, y) cells in the map, array of shape (n, 2)
+        :param uniforms: one uniform number per unit
+        :param away: for each unit, whether it goes away from the target
+        :return: the steps, and whether each unit has one. Units on cells that can't
+            reach the target, or that can't get any further away, have none
+        """
+        if away is None:
+            away = np.zeros(len(positions), dtype=bool)
+        height, width = self.distances.shape
+        neighbours = positions[:, None, :] + NEIGHBOUR_MOVES[None, :, :]
+        in_map = (
+            (neighbours[..., 0] >= 0)
+            & (neighbours[..., 0] < width)
+            & (neighbours[..., 1] >= 0)
+            & (neighbours[..., 1] < height)
+        )
+        neighbour_distances = np.where(
+            in_map,
+            self.distances[
+                np.clip(neighbours[..., 1], 0, height - 1),
+                np.clip(neighbours[..., 0], 0, width - 1),
+            ],
+            -1,
+        )
+        here = self.distances[positions[:, 1], positions[:, 0]]
+
+        # the larger the score, the better the neighbour
+        scores = np.where(away[:, None], neighbour_distances, -neighbour_distances)
+        scores = np.where(neighbour_distances >= 0, scores, np.iinfo(np.int32).min)
+        best_scores = scores.max(axis=1)
+        has_step = (here >= 0) & (best_scores > np.where(away, here, -here))
+
+        candidates = scores == best_scores[:, None]
+        chosen = (uniforms * candidates.sum(axis=1)).astype(int)
+        choice = np.argmax(np.cumsum(candidates, axis=1) > chosen[:, None], axis=1)
+        return NEIGHBOUR_MOVES[choice], has_step
+
+
+class FlowFields:
+    """
+    What ghosts steer with: a flow field to the player, recomputed only when the
+    player changes cell, and the routing table of the map to go to the waypoints.
+    """
+
+    def __init__(
+        self,
+        collision_grid: CollisionGrid = None,
+        routing_table: "RoutingTable" = None,
+    ):
+        """
+        :param collision_grid: blocking tiles of the map, the other cells are walkable
+        :param routing_table: next hops between the cells of the map
+        """
+        self.walkable = collision_grid.grid == 0
+        self.routing_table = routing_table
+        self.player_field: Optional[FlowField] = None
+
+    def update_player(self, position: GridPosition) -> None:
+        cell = position.cell
+        if cell is None or (self.player_field and self.player_field.target == cell):
+            return
+        self.player_field = FlowField(self.walkable, cell)
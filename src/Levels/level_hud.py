@@ -1,10 +1,9 @@
-import time
-
 import pygame
 from pygame.sprite import Sprite
 from pygame import Vector2, Rect, Surface
 from pygame.image import load
 from pygame.transform import scale
+from src.Levels.clock import LevelClock, RealTimeClock
 from src.Units.player import Player
 
 
@@ -29,6 +28,7 @@ class PlayerDataHUD:
         self.measure_timer: MeasureTimer = MeasureTimer(
             last_measure_time=self.player.last_measure_time,
             min_measure_time=self.player.min_measure_time,
+            clock=self.player.clock,
         )
 
         self.update()
@@ -53,7 +53,16 @@ class PlayerDataHUD:
 
 
 class MeasureTimer:
-    def __init__(self, last_measure_time: int = 0, min_measure_time: int = 0):
+    def __init__(
+        self,
+        last_measure_time: int = 0,
+        min_measure_time: int = 0,
+        clock: LevelClock = None,
+    ):
+        """
+        :param clock: time of the level, the one the measure times are read on
+        """
+        self.clock = RealTimeClock() if clock is None else clock
         self.last_measure_time = last_measure_time
         self.min_measure_time = min_measure_time
         self.time_to_wait = 0
@@ -63,7 +72,7 @@ class MeasureTimer:
     def update(self, last_measure_time: int = 0, min_measure_time: int = 0):
         self.last_measure_time = last_measure_time
         self.min_measure_time = min_measure_time
-        time_waited = int(time.time() - self.last_measure_time)
+        time_waited = int(self.clock.now() - self.last_measure_time)
         self.time_to_wait = (
             self.min_measure_time - time_waited
             if time_waited < self.min_measure_time
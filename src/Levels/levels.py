@@ -4,7 +4,9 @@ from pygame import Vector2, Surface
 from pygame.mixer import Channel
 
 from src.Levels.base_level import BaseLevel
+from src.Levels.clock import LevelClock
 from src.Score.score import ScoreSystem
+from src.user_interfaces import GameUserInterface
 
 
 class CatacombLevel(BaseLevel):
@@ -19,6 +21,9 @@ class CatacombLevel(BaseLevel):
         enemies_channel: Channel = None,
         ghost_parameters: GhostParameters = None,
         score_system: ScoreSystem = None,
+        user_interface: GameUserInterface = None,
+        headless: bool = False,
+        clock: LevelClock = None,
     ):
         super().__init__(
             cellSize=cellSize,
@@ -31,6 +36,9 @@ class CatacombLevel(BaseLevel):
             ghost_parameters=ghost_parameters,
             score_system=score_system,
             difficulty=ghost_parameters.difficulty,
+            user_interface=user_interface,
+            headless=headless,
+            clock=clock,
         )
         self.level_name = "src/Levels/levels/catacombs.tmx"
         self.level_title = "The Catacombs"
@@ -58,6 +66,9 @@ class TheMazeLevel(BaseLevel):
         enemies_channel: Channel = None,
         ghost_parameters: GhostParameters = None,
         score_system: ScoreSystem = None,
+        user_interface: GameUserInterface = None,
+        headless: bool = False,
+        clock: LevelClock = None,
     ):
         super().__init__(
             cellSize=cellSize,
@@ -70,6 +81,9 @@ class TheMazeLevel(BaseLevel):
             ghost_parameters=ghost_parameters,
             score_system=score_system,
             difficulty=ghost_parameters.difficulty,
+            user_interface=user_interface,
+            headless=headless,
+            clock=clock,
         )
         self.level_name = "src/Levels/levels/the_maze.tmx"
         self.level_title = "The Maze"
@@ -97,6 +111,9 @@ class IntoTheCavesLevel(BaseLevel):
         enemies_channel: Channel = None,
         ghost_parameters: GhostParameters = None,
         score_system: ScoreSystem = None,
+        user_interface: GameUserInterface = None,
+        headless: bool = False,
+        clock: LevelClock = None,
     ):
         super().__init__(
             cellSize=cellSize,
@@ -109,6 +126,9 @@ class IntoTheCavesLevel(BaseLevel):
             ghost_parameters=ghost_parameters,
             score_system=score_system,
             difficulty=ghost_parameters.difficulty,
+            user_interface=user_interface,
+            headless=headless,
+            clock=clock,
         )
         self.level_name = "src/Levels/levels/into_the_caves.tmx"
         self.level_title = "Into The Caves"
@@ -136,6 +156,9 @@ class TheCavesLevel(BaseLevel):
         enemies_channel: Channel = None,
         ghost_parameters: GhostParameters = None,
         score_system: ScoreSystem = None,
+        user_interface: GameUserInterface = None,
+        headless: bool = False,
+        clock: LevelClock = None,
     ):
         super().__init__(
             cellSize=cellSize,
@@ -148,6 +171,9 @@ class TheCavesLevel(BaseLevel):
             ghost_parameters=ghost_parameters,
             score_system=score_system,
             difficulty=ghost_parameters.difficulty,
+            user_interface=user_interface,
+            headless=headless,
+            clock=clock,
         )
         self.level_name = "src/Levels/levels/the_caves.tmx"
         self.level_title = "The Caves"
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from src.Levels.collision_grid import shift
+from src.Levels.flow_field import NEIGHBOUR_MOVES, bfs_distances_to_all
+
+# routing tables are computed once per map and kept here, see RoutingTable.for_map
+ROUTING_TABLES_FOLDER = "src/Levels/routing_tables"
+# bump when the content of the tables changes, to ignore the old files
+ROUTING_TABLE_VERSION = 1
+# next hop of the cells that can't reach the target, or are on it
+NO_HOP = 255
+
+
+def compute_next_hops(walkable: np.ndarray) -> np.ndarray:
+    """
+    next_hops[k, y, x] is the index in NEIGHBOUR_MOVES of the first step of a shortest
+    path from (x, y) to the k-th walkable cell, in row-major order, or NO_HOP.
+    """
+    targets = [(x, y) for y, x in zip(*np.nonzero(walkable))]
+    distances = bfs_distances_to_all(walkable, targets)
+    next_hops = np.full(distances.shape, NO_HOP, dtype=np.uint8)
+    # go through the moves backwards, so that the first one getting closer wins
+    for index in range(len(NEIGHBOUR_MOVES) - 1, -1, -1):
+        neighbour_distances = shift(distances, NEIGHBOUR_MOVES[index], fill=-1)
+        closer = (neighbour_distances >= 0) & (neighbour_distances == distances - 1)
+        next_hops[closer] = index
+    return next_hops
+
+
+class RoutingTable:
+    """
+    Shortest-path next hops from every cell of a map to every walkable cell, so that
+    units heading to any cell, e.g. a splitter, only need one lookup per step.
+    """
+
+    def __init__(self, walkable: np.ndarray, next_hops: np.ndarray = None):
+        """
+        :param walkable: boolean grid indexed as walkable[y, x]
+        :param next_hops: the table, if already computed
+        """
+        self.walkable = walkable
+        self.target_index = np.full(walkable.shape, -1, dtype=np.int64)
+        self.target_index[walkable] = np.arange(np.count_nonzero(walkable))
+        self.next_hops = compute_next_hops(walkable) if next_hops is None else next_hops
+
+    @classmethod
+    def for_map(
+        cls,
+        tmx_path: str,
+        walkable: np.ndarray,
+        folder: str = ROUTING_TABLES_FOLDER,
+    ) -> "RoutingTable":
+        """
+        Load the table of the map from the cache, keyed by the hash of the TMX file,
+        or compute it and save it there when it is missing or corrupt.
+        """
+        with open(tmx_path, "rb") as tmx_file:
+            digest = hashlib.sha256(tmx_file.read()).hexdigest()[:16]
+        map_name = os.path.splitext(os.path.basename(tmx_path))[0]
+        path = os.path.join(folder, f"{map_name}-{digest}-v{ROUTING_TABLE_VERSION}.npz")
+
+        if os.path.exists(path):
+            try:
+                with np.load(path) as cached:
+                    if np.array_equal(cached["walkable"], walkable):
+                        return cls(walkable, next_hops=cached["next_hops"])
+            except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+                # a corrupt cache is computed again, and overwritten
+                pass
+
+        routing_table = cls(walkable)
+        os.makedirs(folder, exist_ok=True)
+        # written aside then moved into place, so that other processes loading the
+        # same map never read a half written file
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix=".npz", dir=folder)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.savez_compressed(
+                    file, walkable=walkable, next_hops=routing_table.next_hops
+                )
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        return routing_table
+
+    def steps(
+        self, positions: np.ndarray, targets: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :param positions: integer (x, y) cells in the map, array of shape (n, 2)
+        :param targets: integer (x, y) cells in the map to go to, same shape
+        :return: the next steps, and whether each unit has one
+        """
+        target_index = self.target_index[targets[:, 1], targets[:, 0]]
+        hops = self.next_hops[
+            np.maximum(target_index, 0), positions[:, 1], positions[:, 0]
+        ]
+        has_step = (target_index >= 0) & (hops != NO_HOP)
+        return NEIGHBOUR_MOVES[np.where(has_step, hops, 0)], has_step
@@ -1,14 +1,70 @@
-from numpy import random
+from typing import Iterable
+
+import numpy as np
 from pygame import Vector2
 
+from src.Levels.collision_grid import CollisionGrid
+from src.Units.position import GridPosition
+from src.random_numbers import rng
+
+
+class SpawnCells:
+    """
+    The cells where units can appear: walkable, out of the borders, far enough from
+    the player and not taken yet. They are computed once when the level is loaded,
+    so that a position is drawn with a single random index, without retries.
+    """
+
+    def __init__(
+        self,
+        collision_grid: CollisionGrid = None,
+        player_position: Vector2 = None,
+        occupied: Iterable[GridPosition] = (),
+    ):
+        """
+        :param collision_grid: blocking tiles of the map, units don't spawn on them
+        :param player_position: units don't spawn less than 5 cells right of the player
+        :param occupied: positions already taken by other units
+        """
+        height, width = collision_grid.grid.shape
+        min_x, min_y = 5, 2
+        if player_position is not None:
+            min_x = max(min_x, int(player_position.x) + 5)
+
+        free = collision_grid.grid == 0
+        free[:, :min_x] = False
+        free[:min_y, :] = False
+        free[height - 2 :, :] = False
+        for position in occupied:
+            cell = collision_grid.cell(GridPosition.of(position))
+            if cell is not None:
+                free[cell[1], cell[0]] = False
+
+        ys, xs = np.nonzero(free)
+        self.cells = np.column_stack([xs, ys])
+        # the cells before this index are still free, the ones after it are taken
+        self.available = len(self.cells)
+
+    def __len__(self) -> int:
+        return self.available
 
-def generate_random_positions(
-    worldSize: Vector2 = None, player_position: Vector2 = None
-):
-    default_x, default_y = 5, 2
-    if player_position is not None:
-        default_x = max(default_x, player_position.x + 5)
-    x = random.randint(default_x, worldSize.x)
-    y = random.randint(default_y, worldSize.y - 2)
+    def take(self, count: int = 1) -> list[GridPosition]:
+        """
+        Draw count distinct free cells and mark them as taken, swapping each drawn cell
+        with the last free one.
 
-    return Vector2(x, y)
+        :param count: number of positions to draw
+        :return: the positions
+        """
+        if count > self.available:
+            raise ValueError(
+                f"Can't spawn {count} units, only {self.available} free cells are left"
+            )
+        indices = rng.integers(self.available - np.arange(count), size=count)
+        positions = []
+        for index in indices:
+            last = self.available - 1
+            self.cells[[index, last]] = self.cells[[last, index]]
+            positions.append(GridPosition(*self.cells[last]))
+            self.available = last
+        return positions
@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+
+from src.Levels.collision_grid import CollisionGrid, WALL, shift
+from src.Units.position import GridPosition
+from src.settings import GHOST_ATTACK_RADIUS, PLAYER_MEASURE_RADIUS
+
+# largest radius the units look within: the measure of the player, and the ghosts
+# detecting the player, see Ghost.detect_player_radius
+VISIBILITY_RADIUS = max(PLAYER_MEASURE_RADIUS, GHOST_ATTACK_RADIUS + 4)
+
+
+def lines_of_sight(opaque: np.ndarray, radius: int) -> np.ndarray:
+    """
+    Whether each cell sees the cells around it, up to radius cells away along x and y.
+
+    A cell sees another one if the segment between their centres doesn't cross an
+    opaque cell. The segment is sampled every half cell along its longest axis. Where
+    a sample lies on the edge between cells, it is only blocked if all of them are
+    opaque, so that the view is the same both ways. All the cells of the map are
+    checked at once for each offset.
+
+    :param opaque: boolean grid indexed as opaque[y, x]
+    :param radius: largest offset checked
+    :return: boolean array seen[y, x, dy + radius, dx + radius]
+    """
+    height, width = opaque.shape
+    window = 2 * radius + 1
+    seen = np.zeros((height, width, window, window), dtype=bool)
+    for dy in range(-radius, radius + 1):
+        for dx in range(-radius, radius + 1):
+            # cells whose target is out of the map stay unseen
+            blocked = shift(np.zeros_like(opaque), (dx, dy), fill=True)
+            samples = 2 * max(abs(dx), abs(dy))
+            for k in range(1, samples):
+                x, y = dx * k / samples, dy * k / samples
+                cells = {
+                    (cell_x, cell_y)
+                    for cell_x in {math.floor(x + 0.5), math.ceil(x - 0.5)}
+                    for cell_y in {math.floor(y + 0.5), math.ceil(y - 0.5)}
+                } - {(0, 0), (dx, dy)}
+                if cells:
+                    blocked |= np.logical_and.reduce(
+                        [shift(opaque, cell, fill=True) for cell in cells]
+                    )
+            seen[:, :, dy + radius, dx + radius] = ~blocked
+    return seen
+
+
+class VisibilityTable:
+    """
+    Lines of sight of a map, computed once when the map is loaded, so that checking
+    whether a unit is within a radius of another one and sees it is a lookup.
+
+    The cells seen from each cell are stored as bitsets, one integer per row of the
+    window around the cell.
+    """
+
+    def __init__(
+        self,
+        collision_grid: CollisionGrid = None,
+        radius: float = VISIBILITY_RADIUS,
+    ):
+        """
+        :param collision_grid: blocking tiles of the map, only walls block the view
+        :param radius: largest radius of the queries
+        """
+        self.radius = int(math.ceil(radius))
+        if 2 * self.radius + 1 > 64:
+            raise ValueError(f"Visibility radius {radius} doesn't fit 64-bit rows")
+        seen = lines_of_sight(collision_grid.grid & WALL > 0, self.radius)
+        bits = np.uint64(1) << np.arange(seen.shape[-1], dtype=np.uint64)
+        self.rows = np.bitwise_or.reduce(np.where(seen, bits, np.uint64(0)), axis=-1)
+        self.collision_grid = collision_grid
+
+    def sees(self, position_1: GridPosition, position_2: GridPosition) -> bool:
+        """
+        :return: whether nothing blocks the view between the two positions. Positions
+            between cells, or too far apart for the table, are always seen
+        """
+        cell_1 = self.collision_grid.cell(position_1)
+        cell_2 = self.collision_grid.cell(position_2)
+        if cell_1 is None or cell_2 is None:
+            return True
+        dx, dy = cell_2[0] - cell_1[0], cell_2[1] - cell_1[1]
+        if abs(dx) > self.radius or abs(dy) > self.radius:
+            return True
+        row = int(self.rows[cell_1[1], cell_1[0], dy + self.radius])
+        return bool(row >> (dx + self.radius) & 1)
+
+    def sees_all(self, positions: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """
+        sees for many units looking at the same target.
+
+        :param positions: integer (x, y) cells in the map, array of shape (n, 2)
+        :param target: integer (x, y) cell in the map
+        """
+        offsets = (np.asarray(target) - positions).astype(np.int64)
+        in_window = np.all(np.abs(offsets) <= self.radius, axis=1)
+        window = np.clip(offsets + self.radius, 0, 2 * self.radius)
+        rows = self.rows[positions[:, 1], positions[:, 0], window[:, 1]]
+        bits = (rows >> window[:, 0].astype(np.uint64)) & np.uint64(1)
+        return ~in_window | (bits > 0)
+
+    def in_sight(
+        self, position_1: GridPosition, position_2: GridPosition, radius: float
+    ) -> bool:
+        """
+        :return: whether the positions are at most radius apart and see each other
+        """
+        return position_1.distance_squared_to(position_2) <= radius**2 and self.sees(
+            position_1, position_2
+        )
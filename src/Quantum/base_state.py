@@ -0,0 +1,245 @@
+from typing import Optional, Callable
+
+import numpy as np
+
+from src.random_numbers import rng
+from src.settings import MAX_GHOSTS_PER_STATE, QUANTUM_PRUNE_EPSILON
+
+# states with a smaller norm than this are numerical noise, i.e. nothing is left
+NORM_TOLERANCE = 1e-12
+# BS**8 is the identity on the states that fit in the truncated modes, where
+# a b^+ + a^+ b has integer eigenvalues
+BEAM_SPLITTER_PERIOD = 8
+
+
+def prune_amplitude_array(
+    amplitudes: np.ndarray, probs: np.ndarray, epsilon: float
+) -> Optional[np.ndarray]:
+    """
+    Set the amplitudes of probability below epsilon to zero and renormalize.
+
+    :param probs: |amplitudes|^2, with the same shape
+    :return: the new amplitudes, or None if there was nothing to prune
+    """
+    negligible = (probs > 0) & (probs < epsilon)
+    if not negligible.any() or negligible.sum() == np.count_nonzero(probs):
+        return None
+    pruned = np.where(negligible, 0, amplitudes)
+    return pruned / np.linalg.norm(pruned)
+
+
+class BaseQuantumState:
+    """
+    Quantum state of the ghosts carried by one QGhost.
+
+    Every visible part of the QGhost is a mode of the state, which may hold
+    between 0 and max_ghosts_per_state - 1 ghosts. Backends store the amplitudes
+    in whatever way suits them, but they all expose the same operations.
+
+    Beam splitters are not applied right away: they are written to a journal, where
+    consecutive splitters on the same pair of modes fuse into one, and the journal is
+    only applied when the state is read.
+
+    Quantities derived from the amplitudes (marginals, norm, sampling CDF) are cached
+    until the state changes, so reading them again costs nothing.
+
+    Backends implement the apply_* and compute_* methods, which work on the stored
+    amplitudes, and leave the journal and the cache to this class.
+    """
+
+    def __init__(
+        self,
+        occupations: list[int] = None,
+        max_ghosts_per_state: int = MAX_GHOSTS_PER_STATE,
+    ):
+        """
+        :param occupations: number of ghosts in each mode, e.g. [1] for a single ghost
+        :param max_ghosts_per_state: dimension of the Hilbert space of each mode
+        """
+        self.max_ghosts_per_state = max_ghosts_per_state
+        # incremented on every change of the state
+        self.version: int = 0
+        # version of the state after the last compaction, to skip it while nothing changed
+        self.compacted_version: Optional[int] = None
+        self.cache: dict = {}
+        # pending beam splitters as [mode, other mode, number of passes]
+        self.journal: list[list[int]] = []
+
+    def state_changed(self) -> None:
+        self.version += 1
+        self.cache.clear()
+
+    def cached(self, name: str, compute: Callable):
+        if name not in self.cache:
+            self.apply_journal()
+            value = compute()
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+            self.cache[name] = value
+        return self.cache[name]
+
+    @property
+    def n_modes(self) -> int:
+        raise NotImplementedError
+
+    def add_vacuum_mode(self) -> None:
+        raise NotImplementedError
+
+    def apply_beam_splitter(
+        self, affected_ghost_index: int, other_state_index: int, passes: int = 1
+    ) -> None:
+        """
+        Apply the beam splitter passes times in a row, i.e. BS**passes.
+        """
+        raise NotImplementedError
+
+    def apply_projection(self, modes: list[int]) -> bool:
+        raise NotImplementedError
+
+    def apply_pruning(self, epsilon: float) -> bool:
+        raise NotImplementedError
+
+    def beam_splitter(
+        self, affected_ghost_index: int, other_state_index: Optional[int] = None
+    ) -> "BaseQuantumState":
+        """
+        Perform beam-splitter operation.
+
+        :param affected_ghost_index: the mode hitting the splitter
+        :param other_state_index: index of the other mode, if two existing ghosts interact.
+            If not given, a new mode in vacuum is appended and used instead.
+        :return: the state after the operation
+        """
+        if other_state_index is None:
+            # appending a mode commutes with the pending splitters, which act on the others
+            self.add_vacuum_mode()
+            other_state_index = self.n_modes - 1
+        self.state_changed()
+
+        pair = {affected_ghost_index, other_state_index}
+        for operation in reversed(self.journal):
+            if set(operation[:2]) == pair:
+                # BS is symmetric in its two modes, BS**m * BS**n = BS**(m + n)
+                operation[2] += 1
+                return self
+            if pair & set(operation[:2]):
+                # splitters on disjoint pairs commute, the others don't
+                break
+        self.journal.append([affected_ghost_index, other_state_index, 1])
+        return self
+
+    def apply_journal(self) -> None:
+        for affected_ghost_index, other_state_index, passes in self.journal:
+            # whole periods are the identity, and the gates are cached by passes
+            passes %= BEAM_SPLITTER_PERIOD
+            if passes:
+                self.apply_beam_splitter(
+                    affected_ghost_index, other_state_index, passes
+                )
+        self.journal.clear()
+
+    def compute_occupation_probabilities(self) -> np.ndarray:
+        raise NotImplementedError
+
+    def compute_basis_probabilities(self) -> np.ndarray:
+        raise NotImplementedError
+
+    def basis_state(self, index: int) -> np.ndarray:
+        """
+        Number of ghosts in each mode for the basis state of the given index,
+        the index being the one of compute_basis_probabilities.
+        """
+        raise NotImplementedError
+
+    def occupation_probabilities(self) -> np.ndarray:
+        """
+        Marginal probabilities of every mode, computed in one pass over the state.
+
+        :return: array p of shape (n_modes, maximum occupation + 1), where p[k, n] is
+            the probability of finding n ghosts in mode k
+        """
+        return self.cached(
+            "occupation_probabilities", self.compute_occupation_probabilities
+        )
+
+    def basis_probabilities(self) -> np.ndarray:
+        """
+        |amplitude|^2 of every basis state stored by the backend.
+        """
+        return self.cached("basis_probabilities", self.compute_basis_probabilities)
+
+    def norm(self) -> float:
+        return self.cached(
+            "norm", lambda: float(np.sqrt(np.sum(self.basis_probabilities())))
+        )
+
+    def cumulative_probabilities(self) -> np.ndarray:
+        """
+        Normalized cumulative distribution of the basis states, for sampling.
+        """
+        return self.cached(
+            "cumulative_probabilities",
+            lambda: np.cumsum(self.basis_probabilities()) / self.norm() ** 2,
+        )
+
+    def vacuum_probabilities(self) -> np.ndarray:
+        """
+        Probability of finding no ghost, for every mode.
+        """
+        return self.occupation_probabilities()[:, 0]
+
+    def vacuum_probability(self, mode: int) -> float:
+        """
+        Probability of finding no ghost in the given mode.
+        """
+        return float(self.vacuum_probabilities()[mode])
+
+    def project_out(self, modes: list[int]) -> bool:
+        """
+        Project the given modes onto vacuum, remove them from the state and renormalize.
+
+        :return: False if nothing is left of the state, i.e. all the ghosts were in those modes
+        """
+        self.apply_journal()
+        if not self.apply_projection(modes):
+            return False
+        self.state_changed()
+        return True
+
+    def prune_amplitudes(self, epsilon: float) -> None:
+        """
+        Drop the amplitudes of probability below epsilon and renormalize.
+        """
+        self.apply_journal()
+        if self.apply_pruning(epsilon):
+            self.state_changed()
+
+    def compact(self, epsilon: float = QUANTUM_PRUNE_EPSILON) -> list[int]:
+        """
+        Drop negligible amplitudes, then trace out the modes that are empty
+        with probability larger than 1 - epsilon.
+
+        Compaction waits for the state to be read: while beam splitters are pending in
+        the journal, it does nothing, so that they keep fusing over the next ticks.
+
+        :return: the removed modes
+        """
+        if self.journal or self.compacted_version == self.version:
+            return []
+        self.prune_amplitudes(epsilon)
+        vacuum_modes = list(np.flatnonzero(self.vacuum_probabilities() > 1 - epsilon))
+        if vacuum_modes and len(vacuum_modes) < self.n_modes:
+            self.project_out(vacuum_modes)
+        else:
+            vacuum_modes = []
+        self.compacted_version = self.version
+        return vacuum_modes
+
+    def sample_occupations(self) -> np.ndarray:
+        """
+        Draw the number of ghosts in each mode, as a measurement would.
+        """
+        cdf = self.cumulative_probabilities()
+        # binary search of the first basis state whose cumulative probability exceeds u
+        surviving_state_idx = np.searchsorted(cdf, rng.uniform(), side="right")
+        return self.basis_state(min(surviving_state_idx, cdf.size - 1))
@@ -0,0 +1,209 @@
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+
+from src.Quantum.base_state import (
+    BaseQuantumState,
+    NORM_TOLERANCE,
+    prune_amplitude_array,
+)
+from src.Quantum.utils import beam_splitter_matrix
+from src.settings import MAX_GHOSTS_PER_STATE, BEAM_SPLITTER_CACHE_SIZE
+
+
+@lru_cache(maxsize=None)
+def binomial_table(n_max: int) -> np.ndarray:
+    """
+    Pascal's triangle, table[n, k] = C(n, k) for 0 <= n, k <= n_max.
+    """
+    table = np.zeros((n_max + 1, n_max + 1), dtype=np.int64)
+    table[:, 0] = 1
+    for n in range(1, n_max + 1):
+        table[n, 1:] = table[n - 1, 1:] + table[n - 1, :-1]
+    return table
+
+
+def fock_space_dimension(n_modes: int, n_ghosts: int) -> int:
+    return int(binomial_table(n_modes + n_ghosts)[n_modes + n_ghosts - 1, n_ghosts])
+
+
+def rank_fock_states(states: np.ndarray, n_ghosts: int) -> np.ndarray:
+    """
+    Index of each occupation vector |n_0, ..., n_{m-1}> with n_0 + ... = n_ghosts
+    in the fixed-number subspace.
+
+    A state is seen as n_ghosts stars and m - 1 bars, and is ranked by the
+    positions c_k of its bars in the combinatorial number system: sum_k C(c_k, k + 1).
+
+    :param states: array of shape (number of states, number of modes)
+    """
+    n_modes = states.shape[1]
+    bar_positions = np.cumsum(states[:, :-1], axis=1) + np.arange(n_modes - 1)
+    table = binomial_table(n_modes + n_ghosts)
+    return table[bar_positions, np.arange(1, n_modes)].sum(axis=1)
+
+
+@lru_cache(maxsize=64)
+def fock_basis(n_modes: int, n_ghosts: int) -> np.ndarray:
+    """
+    All the occupation vectors with n_ghosts ghosts in n_modes modes,
+    row r being the state of rank r.
+    """
+    n_slots = n_modes + n_ghosts - 1
+    bars = np.array(
+        list(combinations(range(n_slots), n_modes - 1)), dtype=np.int64
+    ).reshape(fock_space_dimension(n_modes, n_ghosts), n_modes - 1)
+    edges = np.hstack(
+        [
+            np.full((len(bars), 1), -1),
+            bars,
+            np.full((len(bars), 1), n_slots),
+        ]
+    )
+    states = np.diff(edges, axis=1) - 1
+
+    basis = np.empty_like(states)
+    basis[rank_fock_states(states, n_ghosts)] = states
+    basis.setflags(write=False)
+    return basis
+
+
+@lru_cache(maxsize=BEAM_SPLITTER_CACHE_SIZE)
+def fock_beam_splitter(
+    n_modes: int,
+    n_ghosts: int,
+    affected_ghost_index: int,
+    other_state_index: int,
+    passes: int = 1,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    BS**passes between two modes as a sparse matrix on the fixed-number subspace,
+    new_amplitudes[dst] += coefficients * amplitudes[src].
+    Cached: see fock_beam_splitter.cache_info() for hits and misses. The journal
+    applies passes modulo BEAM_SPLITTER_PERIOD, so they take few values.
+    """
+    i, j = affected_ghost_index, other_state_index
+    basis = fock_basis(n_modes, n_ghosts)
+    # the gate only mixes states with the same number of ghosts in modes i and j
+    gate = beam_splitter_matrix(n_ghosts + 1, passes).reshape((n_ghosts + 1,) * 4)
+    n_i, n_j = basis[:, i], basis[:, j]
+    n_pair = n_i + n_j
+
+    src, dst, coefficients = [], [], []
+    for new_n_i in range(n_ghosts + 1):
+        this_src = np.flatnonzero(n_pair >= new_n_i)
+        target_states = basis[this_src].copy()
+        target_states[:, i] = new_n_i
+        target_states[:, j] = n_pair[this_src] - new_n_i
+        src.append(this_src)
+        dst.append(rank_fock_states(target_states, n_ghosts))
+        coefficients.append(
+            gate[new_n_i, n_pair[this_src] - new_n_i, n_i[this_src], n_j[this_src]]
+        )
+    transitions = tuple(np.concatenate(arrays) for arrays in (src, dst, coefficients))
+    for array in transitions:
+        array.setflags(write=False)
+    return transitions
+
+
+class FockQuantumState(BaseQuantumState):
+    """
+    Beam splitters and projections never create ghosts, so the state always stays in
+    the subspace with a fixed total number of ghosts N. Only the C(n + N - 1, N)
+    amplitudes of that subspace are stored, indexed by rank_fock_states.
+
+    The number of ghosts in a mode is not truncated to max_ghosts_per_state - 1,
+    which makes no difference as long as N < max_ghosts_per_state.
+    """
+
+    def __init__(
+        self,
+        occupations: list[int] = None,
+        max_ghosts_per_state: int = MAX_GHOSTS_PER_STATE,
+    ):
+        super().__init__(
+            occupations=occupations, max_ghosts_per_state=max_ghosts_per_state
+        )
+        self.n_ghosts = int(sum(occupations))
+        self._n_modes = len(occupations)
+        self.amplitudes = np.zeros(
+            fock_space_dimension(self._n_modes, self.n_ghosts), dtype=complex
+        )
+        self.amplitudes[rank_fock_states(np.array([occupations]), self.n_ghosts)] = 1
+
+    @property
+    def n_modes(self) -> int:
+        return self._n_modes
+
+    @property
+    def basis(self) -> np.ndarray:
+        return fock_basis(self._n_modes, self.n_ghosts)
+
+    def add_vacuum_mode(self) -> None:
+        new_states = np.hstack(
+            [self.basis, np.zeros((len(self.basis), 1), dtype=np.int64)]
+        )
+        self._n_modes += 1
+        new_amplitudes = np.zeros(
+            fock_space_dimension(self._n_modes, self.n_ghosts), dtype=complex
+        )
+        new_amplitudes[rank_fock_states(new_states, self.n_ghosts)] = self.amplitudes
+        self.amplitudes = new_amplitudes
+
+    def apply_beam_splitter(
+        self, affected_ghost_index: int, other_state_index: int, passes: int = 1
+    ) -> None:
+        src, dst, coefficients = fock_beam_splitter(
+            self._n_modes,
+            self.n_ghosts,
+            affected_ghost_index,
+            other_state_index,
+            passes,
+        )
+        new_amplitudes = np.zeros_like(self.amplitudes)
+        np.add.at(new_amplitudes, dst, coefficients * self.amplitudes[src])
+        self.amplitudes = new_amplitudes
+
+    def compute_basis_probabilities(self) -> np.ndarray:
+        return np.abs(self.amplitudes) ** 2
+
+    def basis_state(self, index: int) -> np.ndarray:
+        return self.basis[index].copy()
+
+    def compute_occupation_probabilities(self) -> np.ndarray:
+        probs = self.basis_probabilities()
+        n_occupations = self.n_ghosts + 1
+        # histogram of (mode, occupation) pairs weighted by the probability of each state
+        pair_index = self.basis + n_occupations * np.arange(self._n_modes)
+        return np.bincount(
+            pair_index.ravel(),
+            weights=np.repeat(probs, self._n_modes),
+            minlength=self._n_modes * n_occupations,
+        ).reshape(self._n_modes, n_occupations)
+
+    def apply_pruning(self, epsilon: float) -> bool:
+        pruned = prune_amplitude_array(
+            self.amplitudes, self.basis_probabilities(), epsilon
+        )
+        if pruned is None:
+            return False
+        self.amplitudes = pruned
+        return True
+
+    def apply_projection(self, modes: list[int]) -> bool:
+        basis = self.basis
+        surviving = np.all(basis[:, modes] == 0, axis=1)
+        norm = np.linalg.norm(self.amplitudes[surviving])
+        if norm < NORM_TOLERANCE or len(modes) == self._n_modes:
+            return False
+
+        new_states = np.delete(basis[surviving], modes, axis=1)
+        self._n_modes -= len(modes)
+        new_amplitudes = np.zeros(
+            fock_space_dimension(self._n_modes, self.n_ghosts), dtype=complex
+        )
+        new_amplitudes[rank_fock_states(new_states, self.n_ghosts)] = (
+            self.amplitudes[surviving] / norm
+        )
+        self.amplitudes = new_amplitudes
+        return True
@@ -0,0 +1,227 @@
+from typing import Optional
+
+import numpy as np
+
+from src.Quantum.base_state import BaseQuantumState, NORM_TOLERANCE
+from src.Quantum.utils import beam_splitter_matrix
+from src.random_numbers import rng
+from src.settings import MAX_GHOSTS_PER_STATE, MPS_MAX_BOND_DIMENSION
+
+
+def swap_gate(dimension: int) -> np.ndarray:
+    """
+    Two-mode gate exchanging the modes, gate[out_1, out_2, in_1, in_2].
+    """
+    identity = np.eye(dimension)
+    return np.einsum("ad,bc->abcd", identity, identity)
+
+
+def truncated_svd(
+    matrix: np.ndarray, max_bond_dimension: int, epsilon: float = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD keeping at most max_bond_dimension singular values, and only those of weight
+    s**2 at least epsilon. The kept singular values are renormalized.
+    """
+    u, s, vh = np.linalg.svd(matrix, full_matrices=False)
+    kept = int(np.count_nonzero(s > NORM_TOLERANCE))
+    if epsilon:
+        kept = min(kept, int(np.count_nonzero(s**2 >= epsilon)))
+    kept = max(1, min(kept, max_bond_dimension))
+    s = s[:kept] / np.linalg.norm(s[:kept])
+    return u[:, :kept], s, vh[:kept]
+
+
+class MPSQuantumState(BaseQuantumState):
+    """
+    Matrix product state: mode k is a tensor of shape (left bond, n_ghosts + 1, right bond),
+    and the amplitude of |n_0, n_1, ...> is the product of the matrices tensors[k][:, n_k, :].
+
+    The tensors are kept in mixed canonical form around tensors[center], so that a beam
+    splitter between neighbouring modes is a local update whose bonds are truncated to
+    MPS_MAX_BOND_DIMENSION with an SVD. Splitters between distant modes bring them next to
+    each other with swaps first. Memory and time then grow with the number of modes times
+    the bond dimension squared, instead of exponentially with the number of modes.
+
+    As for the fock backend, the number of ghosts in a mode goes up to n_ghosts.
+    """
+
+    def __init__(
+        self,
+        occupations: list[int] = None,
+        max_ghosts_per_state: int = MAX_GHOSTS_PER_STATE,
+        max_bond_dimension: int = MPS_MAX_BOND_DIMENSION,
+    ):
+        super().__init__(
+            occupations=occupations, max_ghosts_per_state=max_ghosts_per_state
+        )
+        self.n_ghosts = int(sum(occupations))
+        self.local_dimension = self.n_ghosts + 1
+        self.max_bond_dimension = max_bond_dimension
+        self.tensors = []
+        for n in occupations:
+            tensor = np.zeros((1, self.local_dimension, 1), dtype=complex)
+            tensor[0, n, 0] = 1
+            self.tensors.append(tensor)
+        # a product state is canonical around any mode
+        self.center = 0
+        # version of the state after the last pruning, to skip it while nothing changed
+        self.pruned_version: Optional[int] = None
+
+    @property
+    def n_modes(self) -> int:
+        return len(self.tensors)
+
+    @property
+    def bond_dimensions(self) -> list[int]:
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def move_center(self, mode: int) -> None:
+        """
+        Move the orthogonality center to the given mode with QR decompositions.
+        """
+        while self.center < mode:
+            tensor = self.tensors[self.center]
+            left, d, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left * d, right))
+            self.tensors[self.center] = q.reshape(left, d, -1)
+            self.tensors[self.center + 1] = np.tensordot(
+                r, self.tensors[self.center + 1], axes=(1, 0)
+            )
+            self.center += 1
+        while self.center > mode:
+            tensor = self.tensors[self.center]
+            left, d, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left, d * right).T)
+            self.tensors[self.center] = q.T.reshape(-1, d, right)
+            self.tensors[self.center - 1] = np.tensordot(
+                self.tensors[self.center - 1], r.T, axes=(2, 0)
+            )
+            self.center -= 1
+
+    def apply_two_mode_gate(self, mode: int, gate: np.ndarray) -> None:
+        """
+        Apply gate[out_1, out_2, in_1, in_2] on modes mode and mode + 1,
+        the center ending up on mode + 1.
+        """
+        self.move_center(mode)
+        theta = np.tensordot(self.tensors[mode], self.tensors[mode + 1], axes=(2, 0))
+        theta = np.einsum("abcd,lcdr->labr", gate, theta)
+        left, d, _, right = theta.shape
+        u, s, vh = truncated_svd(
+            theta.reshape(left * d, d * right), self.max_bond_dimension
+        )
+        self.tensors[mode] = u.reshape(left, d, -1)
+        self.tensors[mode + 1] = (s[:, None] * vh).reshape(-1, d, right)
+        self.center = mode + 1
+
+    def add_vacuum_mode(self) -> None:
+        vacuum = np.zeros((1, self.local_dimension, 1), dtype=complex)
+        vacuum[0, 0, 0] = 1
+        self.tensors.append(vacuum)
+
+    def apply_beam_splitter(
+        self, affected_ghost_index: int, other_state_index: int, passes: int = 1
+    ) -> None:
+        # BS is symmetric in its two modes, only their positions matter
+        first, last = sorted([affected_ghost_index, other_state_index])
+        gate = beam_splitter_matrix(self.local_dimension, passes).reshape(
+            (self.local_dimension,) * 4
+        )
+        swap = swap_gate(self.local_dimension)
+        for mode in range(last - 1, first, -1):
+            self.apply_two_mode_gate(mode, swap)
+        self.apply_two_mode_gate(first, gate)
+        for mode in range(first + 1, last):
+            self.apply_two_mode_gate(mode, swap)
+
+    def norm(self) -> float:
+        return self.cached(
+            "norm", lambda: float(np.linalg.norm(self.tensors[self.center]))
+        )
+
+    def compute_occupation_probabilities(self) -> np.ndarray:
+        # the marginal of the center mode is read from its tensor alone
+        probs = np.empty((self.n_modes, self.local_dimension))
+        for mode in range(self.n_modes):
+            self.move_center(mode)
+            probs[mode] = np.sum(np.abs(self.tensors[mode]) ** 2, axis=(0, 2))
+        return probs
+
+    def compute_basis_probabilities(self) -> np.ndarray:
+        """
+        Contracts the whole state, only meant for small states.
+        """
+        amplitudes = np.ones((1, 1), dtype=complex)
+        for tensor in self.tensors:
+            amplitudes = np.tensordot(amplitudes, tensor, axes=(1, 0))
+            amplitudes = amplitudes.reshape(-1, tensor.shape[2])
+        return np.abs(amplitudes[:, 0]) ** 2
+
+    def basis_state(self, index: int) -> np.ndarray:
+        return np.array(np.unravel_index(index, (self.local_dimension,) * self.n_modes))
+
+    def sample_occupations(self) -> np.ndarray:
+        """
+        Draw the modes one after the other from their conditional distributions,
+        which never builds the whole distribution.
+        """
+        self.apply_journal()
+        self.move_center(0)
+        occupations = np.empty(self.n_modes, dtype=int)
+        left = np.ones(1, dtype=complex)
+        for mode, tensor in enumerate(self.tensors):
+            # the modes on the right are right-canonical, they don't weigh on the marginal
+            conditional = np.tensordot(left, tensor, axes=(0, 0))
+            probs = np.sum(np.abs(conditional) ** 2, axis=1)
+            cdf = np.cumsum(probs) / probs.sum()
+            n = min(np.searchsorted(cdf, rng.uniform(), side="right"), cdf.size - 1)
+            occupations[mode] = n
+            left = conditional[n] / np.linalg.norm(conditional[n])
+        return occupations
+
+    def apply_pruning(self, epsilon: float) -> bool:
+        """
+        Drop the Schmidt components of weight below epsilon on every bond.
+        """
+        if self.pruned_version == self.version:
+            return False
+        self.move_center(0)
+        bond_dimensions = self.bond_dimensions
+        for mode in range(self.n_modes - 1):
+            tensor = self.tensors[mode]
+            left, d, right = tensor.shape
+            u, s, vh = truncated_svd(
+                tensor.reshape(left * d, right), self.max_bond_dimension, epsilon
+            )
+            self.tensors[mode] = u.reshape(left, d, -1)
+            self.tensors[mode + 1] = np.tensordot(
+                s[:, None] * vh, self.tensors[mode + 1], axes=(1, 0)
+            )
+            self.center = mode + 1
+        changed = self.bond_dimensions != bond_dimensions
+        # prune_amplitudes increments the version when something was dropped
+        self.pruned_version = self.version + changed
+        return changed
+
+    def apply_projection(self, modes: list[int]) -> bool:
+        if len(modes) == self.n_modes:
+            return False
+        tensors = list(self.tensors)
+        for mode in sorted(modes, reverse=True):
+            # project on vacuum and absorb the remaining matrix into a neighbour
+            matrix = tensors.pop(mode)[:, 0, :]
+            if mode > 0:
+                tensors[mode - 1] = np.tensordot(tensors[mode - 1], matrix, axes=(2, 0))
+            else:
+                tensors[0] = np.tensordot(matrix, tensors[0], axes=(1, 0))
+
+        old_tensors, old_center = self.tensors, self.center
+        self.tensors, self.center = tensors, 0
+        self.move_center(self.n_modes - 1)
+        norm = np.linalg.norm(self.tensors[self.center])
+        if norm < NORM_TOLERANCE:
+            self.tensors, self.center = old_tensors, old_center
+            return False
+        self.tensors[self.center] = self.tensors[self.center] / norm
+        return True
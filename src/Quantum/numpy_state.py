@@ -0,0 +1,87 @@
+import numpy as np
+
+from src.Quantum.base_state import (
+    BaseQuantumState,
+    NORM_TOLERANCE,
+    prune_amplitude_array,
+)
+from src.Quantum.utils import beam_splitter_matrix
+from src.settings import MAX_GHOSTS_PER_STATE
+
+
+class NumpyQuantumState(BaseQuantumState):
+    """
+    Dense state vector stored as an n-dimensional complex array, one axis per mode.
+    Gates only touch the axes of the modes they act on.
+    """
+
+    def __init__(
+        self,
+        occupations: list[int] = None,
+        max_ghosts_per_state: int = MAX_GHOSTS_PER_STATE,
+    ):
+        super().__init__(
+            occupations=occupations, max_ghosts_per_state=max_ghosts_per_state
+        )
+        self.amplitudes = np.zeros(
+            (max_ghosts_per_state,) * len(occupations), dtype=complex
+        )
+        self.amplitudes[tuple(occupations)] = 1
+
+    @property
+    def n_modes(self) -> int:
+        return self.amplitudes.ndim
+
+    def add_vacuum_mode(self) -> None:
+        vacuum = np.zeros(self.max_ghosts_per_state, dtype=complex)
+        vacuum[0] = 1
+        self.amplitudes = np.multiply.outer(self.amplitudes, vacuum)
+
+    def apply_beam_splitter(
+        self, affected_ghost_index: int, other_state_index: int, passes: int = 1
+    ) -> None:
+        gate = beam_splitter_matrix(self.max_ghosts_per_state, passes)
+        # contract the gate with the two affected axes, which end up in front
+        new_amplitudes = np.tensordot(
+            gate.reshape((self.max_ghosts_per_state,) * 4),
+            self.amplitudes,
+            axes=([2, 3], [affected_ghost_index, other_state_index]),
+        )
+        self.amplitudes = np.moveaxis(
+            new_amplitudes, [0, 1], [affected_ghost_index, other_state_index]
+        )
+
+    def compute_basis_probabilities(self) -> np.ndarray:
+        return np.abs(self.amplitudes.ravel()) ** 2
+
+    def basis_state(self, index: int) -> np.ndarray:
+        return np.array(np.unravel_index(index, self.amplitudes.shape))
+
+    def compute_occupation_probabilities(self) -> np.ndarray:
+        probs = self.basis_probabilities().reshape(self.amplitudes.shape)
+        all_modes = set(range(self.n_modes))
+        return np.array(
+            [probs.sum(axis=tuple(all_modes - {mode})) for mode in range(self.n_modes)]
+        )
+
+    def apply_pruning(self, epsilon: float) -> bool:
+        pruned = prune_amplitude_array(
+            self.amplitudes,
+            self.basis_probabilities().reshape(self.amplitudes.shape),
+            epsilon,
+        )
+        if pruned is None:
+            return False
+        self.amplitudes = pruned
+        return True
+
+    def apply_projection(self, modes: list[int]) -> bool:
+        index = tuple(
+            0 if mode in modes else slice(None) for mode in range(self.n_modes)
+        )
+        new_amplitudes = self.amplitudes[index]
+        norm = np.linalg.norm(new_amplitudes)
+        if norm < NORM_TOLERANCE:
+            return False
+        self.amplitudes = new_amplitudes / norm
+        return True
@@ -0,0 +1,165 @@
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from qutip import Qobj, ket, destroy, tensor, qeye
+
+from src.Quantum.base_state import BaseQuantumState, prune_amplitude_array
+from src.settings import MAX_GHOSTS_PER_STATE, BEAM_SPLITTER_CACHE_SIZE
+
+a = destroy(MAX_GHOSTS_PER_STATE)
+BS = (1j * np.pi / 4 * (tensor(a, a.dag()) + tensor(a.dag(), a))).expm()
+# above this many amplitudes, the operator on all the systems is too large to build,
+# so the gate is applied to the two affected systems only
+MAX_EXPANDED_SIZE = 2000
+
+
+@lru_cache(maxsize=BEAM_SPLITTER_CACHE_SIZE)
+def expanded_beam_splitter(
+    n_systems: int, affected_ghost_index: int, other_state_index: int, passes: int = 1
+) -> Qobj:
+    """
+    BS**passes acting on two of n_systems systems, identity on the others.
+    Cached, since the same splitters keep being crossed by the same number of ghosts:
+    see expanded_beam_splitter.cache_info() for hits and misses.
+    """
+    gate = BS if passes == 1 else BS**passes
+    if n_systems == 2:
+        return gate
+
+    # BS acts on the last two systems of tensor(qeye, BS), move them into place
+    index_order = [
+        k
+        for k in range(n_systems)
+        if k not in (affected_ghost_index, other_state_index)
+    ] + [affected_ghost_index, other_state_index]
+
+    dims = [MAX_GHOSTS_PER_STATE] * (n_systems - 2)
+
+    return tensor(qeye(dims), gate).permute(list(np.argsort(index_order)))
+
+
+def beam_splitter(
+    quantum_state: Qobj,
+    affected_ghost_index: int,
+    other_state_index: Optional[int] = None,
+    passes: int = 1,
+) -> Qobj:
+    """
+    Perform beam-splitter operation.
+
+    :param quantum_state: one of the two input states
+    :param affected_ghost_index: there may be several systems in the state, choose this one
+    :param other_state_index: index of the otehr state, if two existing ghosts interact. If not given, vacuum.
+    :param passes: number of times the beam splitter is applied in a row
+    """
+    n_systems = len(quantum_state.dims[0])
+    if other_state_index is None:
+        other_state = ket([0], MAX_GHOSTS_PER_STATE)
+        quantum_state = tensor(quantum_state, other_state)
+        other_state_index = n_systems
+        n_systems += 1
+
+    if max(quantum_state.shape) > MAX_EXPANDED_SIZE:
+        return local_beam_splitter(
+            quantum_state, affected_ghost_index, other_state_index, passes
+        )
+
+    expanded_BS = expanded_beam_splitter(
+        n_systems, affected_ghost_index, other_state_index, passes
+    )
+    return expanded_BS * quantum_state
+
+
+def local_beam_splitter(
+    quantum_state: Qobj,
+    affected_ghost_index: int,
+    other_state_index: int,
+    passes: int = 1,
+) -> Qobj:
+    """
+    Same as beam_splitter, contracting BS**passes with the two affected systems of the
+    ket instead of multiplying it by the operator on all the systems.
+    """
+    gate = (BS if passes == 1 else BS**passes).full()
+    amplitudes = np.tensordot(
+        gate.reshape((MAX_GHOSTS_PER_STATE,) * 4),
+        quantum_state.full().reshape(quantum_state.dims[0]),
+        axes=([2, 3], [affected_ghost_index, other_state_index]),
+    )
+    # the two affected axes end up in front, move them back into place
+    amplitudes = np.moveaxis(
+        amplitudes, [0, 1], [affected_ghost_index, other_state_index]
+    )
+    return Qobj(amplitudes.reshape(-1, 1), dims=quantum_state.dims)
+
+
+class QutipQuantumState(BaseQuantumState):
+    """
+    The state as a qutip ket of dimension max_ghosts_per_state**n_modes.
+    """
+
+    def __init__(
+        self,
+        occupations: list[int] = None,
+        max_ghosts_per_state: int = MAX_GHOSTS_PER_STATE,
+    ):
+        super().__init__(
+            occupations=occupations, max_ghosts_per_state=max_ghosts_per_state
+        )
+        self.ket = ket(occupations, max_ghosts_per_state)
+
+    @property
+    def n_modes(self) -> int:
+        return len(self.ket.dims[0])
+
+    def add_vacuum_mode(self) -> None:
+        self.ket = tensor(self.ket, ket([0], self.max_ghosts_per_state))
+
+    def apply_beam_splitter(
+        self, affected_ghost_index: int, other_state_index: int, passes: int = 1
+    ) -> None:
+        self.ket = beam_splitter(
+            self.ket, affected_ghost_index, other_state_index, passes
+        )
+
+    def vacuum_projector(self, modes: list[int]) -> Qobj:
+        return tensor(
+            [
+                (
+                    ket([0], self.max_ghosts_per_state).dag()
+                    if mode in modes
+                    else qeye(self.max_ghosts_per_state)
+                )
+                for mode in range(self.n_modes)
+            ]
+        )
+
+    def compute_basis_probabilities(self) -> np.ndarray:
+        return np.abs(self.ket.full()[:, 0]) ** 2
+
+    def basis_state(self, index: int) -> np.ndarray:
+        return np.array(
+            np.unravel_index(index, (self.max_ghosts_per_state,) * self.n_modes)
+        )
+
+    def compute_occupation_probabilities(self) -> np.ndarray:
+        return np.array(
+            [np.real(self.ket.ptrace(mode).diag()) for mode in range(self.n_modes)]
+        )
+
+    def apply_pruning(self, epsilon: float) -> bool:
+        pruned = prune_amplitude_array(
+            self.ket.full(), self.basis_probabilities().reshape(-1, 1), epsilon
+        )
+        if pruned is None:
+            return False
+        self.ket = Qobj(pruned, dims=self.ket.dims)
+        return True
+
+    def apply_projection(self, modes: list[int]) -> bool:
+        new_state = self.vacuum_projector(modes) * self.ket
+        if not new_state.norm():
+            return False
+        self.ket = new_state.unit()
+        return True
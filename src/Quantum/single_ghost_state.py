@@ -0,0 +1,82 @@
+import numpy as np
+
+from src.Quantum.base_state import (
+    BaseQuantumState,
+    NORM_TOLERANCE,
+    prune_amplitude_array,
+)
+from src.Quantum.utils import beam_splitter_matrix
+from src.settings import MAX_GHOSTS_PER_STATE
+
+
+def single_ghost_beam_splitter(passes: int = 1) -> np.ndarray:
+    """
+    BS**passes restricted to |10> and |01>, the states with one ghost in two modes.
+    """
+    return beam_splitter_matrix(2, passes)[np.ix_([2, 1], [2, 1])]
+
+
+class SingleGhostQuantumState(BaseQuantumState):
+    """
+    A QGhost carrying exactly one ghost is in a W-like state sum_k c_k |0..1_k..0>,
+    so it is stored as the n amplitudes c_k and every operation is O(n).
+
+    Beam splitters and projections never change the number of ghosts, so such a
+    state never needs the general backends.
+    """
+
+    def __init__(
+        self,
+        occupations: list[int] = None,
+        max_ghosts_per_state: int = MAX_GHOSTS_PER_STATE,
+    ):
+        super().__init__(
+            occupations=occupations, max_ghosts_per_state=max_ghosts_per_state
+        )
+        if sum(occupations) != 1:
+            raise ValueError("SingleGhostQuantumState holds exactly one ghost")
+        self.amplitudes = np.array(occupations, dtype=complex)
+
+    @property
+    def n_modes(self) -> int:
+        return len(self.amplitudes)
+
+    def add_vacuum_mode(self) -> None:
+        self.amplitudes = np.append(self.amplitudes, 0)
+
+    def apply_beam_splitter(
+        self, affected_ghost_index: int, other_state_index: int, passes: int = 1
+    ) -> None:
+        pair = [affected_ghost_index, other_state_index]
+        self.amplitudes[pair] = (
+            single_ghost_beam_splitter(passes) @ self.amplitudes[pair]
+        )
+
+    def compute_basis_probabilities(self) -> np.ndarray:
+        return np.abs(self.amplitudes) ** 2
+
+    def basis_state(self, index: int) -> np.ndarray:
+        occupations = np.zeros(self.n_modes, dtype=int)
+        occupations[index] = 1
+        return occupations
+
+    def compute_occupation_probabilities(self) -> np.ndarray:
+        probs = self.basis_probabilities()
+        return np.column_stack([1 - probs, probs])
+
+    def apply_pruning(self, epsilon: float) -> bool:
+        pruned = prune_amplitude_array(
+            self.amplitudes, self.basis_probabilities(), epsilon
+        )
+        if pruned is None:
+            return False
+        self.amplitudes = pruned
+        return True
+
+    def apply_projection(self, modes: list[int]) -> bool:
+        new_amplitudes = np.delete(self.amplitudes, modes)
+        norm = np.linalg.norm(new_amplitudes)
+        if norm < NORM_TOLERANCE:
+            return False
+        self.amplitudes = new_amplitudes / norm
+        return True
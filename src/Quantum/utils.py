@@ -0,0 +1,77 @@
+from functools import lru_cache
+from importlib import import_module
+
+import numpy as np
+
+from src.Quantum.base_state import BaseQuantumState
+from src.settings import (
+    MAX_GHOSTS_PER_STATE,
+    QUANTUM_BACKEND,
+    BEAM_SPLITTER_CACHE_SIZE,
+    SINGLE_GHOST_FAST_PATH,
+)
+
+# backends are imported lazily, so that e.g. qutip is only needed if it is used
+QUANTUM_BACKENDS = {
+    "fock": ("src.Quantum.fock_state", "FockQuantumState"),
+    "mps": ("src.Quantum.mps_state", "MPSQuantumState"),
+    "numpy": ("src.Quantum.numpy_state", "NumpyQuantumState"),
+    "qutip": ("src.Quantum.qutip_state", "QutipQuantumState"),
+    "single_ghost": ("src.Quantum.single_ghost_state", "SingleGhostQuantumState"),
+}
+
+
+def get_quantum_backend(name: str = QUANTUM_BACKEND) -> type[BaseQuantumState]:
+    if name not in QUANTUM_BACKENDS:
+        raise ValueError(
+            f"Unknown quantum backend '{name}', choose one of {list(QUANTUM_BACKENDS)}"
+        )
+    module_name, class_name = QUANTUM_BACKENDS[name]
+    return getattr(import_module(module_name), class_name)
+
+
+def create_quantum_state(
+    occupations: list[int] = None,
+    max_ghosts_per_state: int = MAX_GHOSTS_PER_STATE,
+    backend: str = QUANTUM_BACKEND,
+    single_ghost_fast_path: bool = SINGLE_GHOST_FAST_PATH,
+) -> BaseQuantumState:
+    """
+    Create the state |n_0, n_1, ...> with the configured backend.
+
+    :param occupations: number of ghosts in each mode
+    :param single_ghost_fast_path: store states with exactly one ghost as a plain
+        vector of amplitudes, whatever the backend
+    """
+    if single_ghost_fast_path and sum(occupations) == 1:
+        backend = "single_ghost"
+    quantum_state_class = get_quantum_backend(backend)
+    return quantum_state_class(
+        occupations=[int(n) for n in occupations],
+        max_ghosts_per_state=max_ghosts_per_state,
+    )
+
+
+def destroy_operator(dimension: int) -> np.ndarray:
+    return np.diag(np.sqrt(np.arange(1, dimension)), k=1)
+
+
+@lru_cache(maxsize=BEAM_SPLITTER_CACHE_SIZE)
+def beam_splitter_matrix(dimension: int, passes: int = 1) -> np.ndarray:
+    """
+    Two-mode beam splitter BS**passes = exp(i * passes * pi / 4 * (a b^+ + a^+ b)),
+    with the first mode as the most significant index, the same as tensor(a, b) in
+    qutip.
+
+    :param dimension: dimension of the Hilbert space of each mode
+    :param passes: number of passes, below BEAM_SPLITTER_PERIOD so that the cache
+        holds at most BEAM_SPLITTER_PERIOD gates per dimension
+    """
+    angle = passes * np.pi / 4
+    a = destroy_operator(dimension)
+    generator = np.kron(a, a.T) + np.kron(a.T, a)
+    # the generator is hermitian, so exponentiate it through its eigenbasis
+    eigenvalues, eigenvectors = np.linalg.eigh(generator)
+    gate = (eigenvectors * np.exp(1j * angle * eigenvalues)) @ eigenvectors.conj().T
+    gate.setflags(write=False)
+    return gate
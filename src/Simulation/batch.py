@@ -0,0 +1,261 @@
+import argparse
+import dataclasses
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from pygame import Vector2
+
+from src.Levels.base_level import BaseLevel
+from src.Levels.flow_field import NEIGHBOUR_MOVES, FlowField
+from src.Simulation.headless import LEVELS, HeadlessGame, PlayerCommands
+from src.Units.ghosts import GhostParameters
+from src.Units.position import GridPosition
+from src.random_numbers import rng
+from src.settings import MAX_DIFFICULTY, TICKS_PER_SECOND
+
+
+class ScriptedPolicy:
+    """
+    A simple player: it walks to the closest visible ghost around the walls, shoots
+    it once it is in line in front of it, and measures ghosts in superposition within
+    reach. It acts once every reaction_ticks ticks, about as often as a player
+    presses keys.
+    """
+
+    def __init__(
+        self, reaction_ticks: int = 8, seed: Optional[np.random.SeedSequence] = None
+    ):
+        """
+        :param reaction_ticks: number of ticks between two commands
+        :param seed: seed of the random choices of the player, kept apart from the
+            random numbers of the game
+        """
+        self.reaction_ticks = reaction_ticks
+        self.random = np.random.default_rng(seed)
+        self.level: Optional[BaseLevel] = None
+        self.ticks = 0
+        self.target_field: Optional[FlowField] = None
+
+    def __call__(self) -> PlayerCommands:
+        self.ticks += 1
+        if self.level is None or self.ticks % self.reaction_ticks:
+            return PlayerCommands()
+
+        player = self.level._player
+        if player.ready_to_measure and self.can_measure():
+            return PlayerCommands(measure=True)
+
+        targets = [ghost.position for ghost in self.level.visible_ghosts_group]
+        if not targets:
+            return PlayerCommands()
+        target = min(targets, key=player.position.distance_squared_to)
+
+        to_target = target - player.position
+        in_line = (to_target.x == 0) != (to_target.y == 0)
+        if in_line and self.level.visibility.sees(player.position, target):
+            direction = Vector2(np.sign(to_target.x), np.sign(to_target.y))
+            if direction == player.direction:
+                return PlayerCommands(attack=True)
+            # turn to the ghost, stepping towards it
+            return PlayerCommands(move=direction)
+        return PlayerCommands(move=self.step_towards(target))
+
+    def can_measure(self) -> bool:
+        player = self.level._player
+        return any(
+            len(qghost.visible_parts) > 1
+            and any(
+                self.level.visibility.in_sight(
+                    player.position, ghost.position, player.measure_radius
+                )
+                for ghost in qghost.visible_parts
+            )
+            for qghost in self.level.ghosts_group
+        )
+
+    def step_towards(self, target: GridPosition) -> Vector2:
+        if self.target_field is None or self.target_field.target != target.cell:
+            walkable = self.level.collision_grid.grid == 0
+            for splitter in self.level.splitters:
+                walkable[splitter.cell[1], splitter.cell[0]] = False
+            self.target_field = FlowField(walkable, target.cell)
+        player = self.level._player
+        steps, has_step = self.target_field.steps(
+            np.array([player.position.cell]), self.random.random(1)
+        )
+        if not has_step[0]:
+            return Vector2(*NEIGHBOUR_MOVES[self.random.integers(len(NEIGHBOUR_MOVES))])
+        return Vector2(*steps[0])
+
+
+@dataclasses.dataclass
+class GameResult:
+    level_id: str
+    difficulty: int
+    seed: int
+    status: Optional[str]
+    score: int
+    ticks: int
+
+
+# the headless game of each worker process
+_game: Optional[HeadlessGame] = None
+
+
+def start_worker() -> None:
+    global _game
+    _game = HeadlessGame()
+
+
+def play_game(level_id: str, difficulty: int, seed: int, max_ticks: int) -> GameResult:
+    """
+    Play one level headless with the scripted policy, in a worker process.
+    """
+    rng.seed(seed)
+    ghost_parameters = GhostParameters()
+    ghost_parameters.change_difficulty(difficulty)
+    # the player draws from its own stream, derived from the seed of the game
+    policy = ScriptedPolicy(seed=np.random.SeedSequence(seed).spawn(1)[0])
+    level = _game.load_level(LEVELS[level_id], ghost_parameters, input_source=policy)
+    policy.level = level
+    ticks = _game.run_level(level, max_ticks=max_ticks)
+    return GameResult(
+        level_id=level_id,
+        difficulty=difficulty,
+        seed=seed,
+        status=level.game_status,
+        score=level.level_score,
+        ticks=ticks,
+    )
+
+
+def run_batch(
+    level_ids: list[str],
+    difficulties: list[int],
+    games: int,
+    max_ticks: int,
+    seed: int = 0,
+    workers: int = None,
+) -> list[GameResult]:
+    """
+    Play games games of every level at every difficulty, spread over worker processes.
+    The games are independent, so the batch scales with the number of cores.
+
+    :param seed: the games are seeded with seed, seed + 1, ...
+    :param workers: number of processes, the number of cores if None
+    """
+    games_to_play = [
+        (level_id, difficulty)
+        for level_id in level_ids
+        for difficulty in difficulties
+        for _ in range(games)
+    ]
+    level_ids, difficulties = zip(*games_to_play)
+    seeds = range(seed, seed + len(games_to_play))
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker) as pool:
+        return list(
+            pool.map(
+                play_game,
+                level_ids,
+                difficulties,
+                seeds,
+                [max_ticks] * len(games_to_play),
+                chunksize=max(1, len(games_to_play) // (4 * workers)),
+            )
+        )
+
+
+def summarize(results: list[GameResult], by_level: bool = True) -> list[dict]:
+    """
+    :param by_level: whether to summarize each level apart, or all of them together
+    :return: win rate, mean score and mean ticks to finish by level and difficulty.
+        Games stopped at max_ticks were never scored, so they are left out of the means
+    """
+    rows = []
+    keys = sorted(
+        {
+            (result.level_id if by_level else "all", result.difficulty)
+            for result in results
+        }
+    )
+    for level_id, difficulty in keys:
+        group = [
+            result
+            for result in results
+            if level_id in (result.level_id, "all") and result.difficulty == difficulty
+        ]
+        finished = [result for result in group if result.status is not None]
+        rows.append(
+            {
+                "level": level_id,
+                "difficulty": difficulty,
+                "games": len(group),
+                "win_rate": np.mean([result.status == "won" for result in group]),
+                "mean_score": (
+                    np.mean([result.score for result in finished])
+                    if finished
+                    else float("nan")
+                ),
+                "mean_ticks_to_finish": (
+                    np.mean([result.ticks for result in finished])
+                    if finished
+                    else float("nan")
+                ),
+                "unfinished": len(group) - len(finished),
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play many headless games with a scripted player, to tune the difficulty."
+    )
+    parser.add_argument("--levels", nargs="+", choices=LEVELS, default=list(LEVELS))
+    parser.add_argument(
+        "--difficulties",
+        nargs="+",
+        type=int,
+        default=list(range(1, MAX_DIFFICULTY + 1)),
+    )
+    parser.add_argument(
+        "--games", type=int, default=10, help="games per level and difficulty"
+    )
+    parser.add_argument(
+        "--max-ticks",
+        type=int,
+        default=5 * 60 * TICKS_PER_SECOND,
+        help="games still running after this many ticks are stopped, unfinished",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    results = run_batch(
+        level_ids=args.levels,
+        difficulties=args.difficulties,
+        games=args.games,
+        max_ticks=args.max_ticks,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    print(
+        f"{'level':<16}{'difficulty':>11}{'games':>7}{'win rate':>10}"
+        f"{'score':>9}{'ticks':>9}{'unfinished':>12}"
+    )
+    rows = summarize(results)
+    if len(args.levels) > 1:
+        rows += summarize(results, by_level=False)
+    for row in rows:
+        print(
+            f"{row['level']:<16}{row['difficulty']:>11}{row['games']:>7}"
+            f"{row['win_rate']:>10.2f}{row['mean_score']:>9.0f}"
+            f"{row['mean_ticks_to_finish']:>9.0f}{row['unfinished']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import dataclasses
+import os
+import time
+from typing import Callable, Optional
+
+import pygame
+from pygame import Vector2
+
+from src.Levels.base_level import BaseLevel
+from src.Levels.clock import SimulationClock
+from src.Levels.levels import (
+    CatacombLevel,
+    TheMazeLevel,
+    IntoTheCavesLevel,
+    TheCavesLevel,
+)
+from src.Score.score import ScoreSystem
+from src.Units.ghosts import GhostParameters
+from src.random_numbers import rng
+from src.user_interfaces import GameUserInterface
+
+# levels by level_id
+LEVELS = {
+    "into_the_caves": IntoTheCavesLevel,
+    "the_caves": TheCavesLevel,
+    "the_catacombs": CatacombLevel,
+    "the_maze": TheMazeLevel,
+}
+
+
+@dataclasses.dataclass
+class PlayerCommands:
+    """
+    What the player does during one tick, as set by GameUserInterface.process_input.
+    """
+
+    move: Vector2 = dataclasses.field(default_factory=Vector2)
+    attack: bool = False
+    measure: bool = False
+
+
+# gives the commands of every tick, or None to quit the level
+InputSource = Callable[[], Optional[PlayerCommands]]
+
+
+def idle_input() -> PlayerCommands:
+    return PlayerCommands()
+
+
+class InjectedUserInterface(GameUserInterface):
+    """
+    The commands of the player come from an input source instead of the keyboard.
+    """
+
+    def __init__(self, input_source: InputSource = idle_input):
+        super().__init__()
+        self.input_source = input_source
+
+    def process_input(self):
+        commands = self.input_source()
+        # like quitting with the keyboard, the last tick has no command
+        keep_running = commands is not None
+        if not keep_running:
+            commands = PlayerCommands()
+        self.movePlayerCommand = Vector2(commands.move)
+        self.attackCommand = commands.attack
+        self.measureCommand = commands.measure
+        return keep_running
+
+
+class HeadlessGame:
+    """
+    Plays levels without window, sound or rendering, updating them as fast as
+    possible, e.g. for load testing, balancing or benchmarks.
+    """
+
+    def __init__(self):
+        # no window nor audio device is opened
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.init()
+        pygame.font.init()
+
+        self.cellSize: Vector2 = Vector2(32, 32)
+        self.worldSize: Vector2 = Vector2(40, 20)
+        self.score_system = ScoreSystem()
+
+    def load_level(
+        self,
+        level: type[BaseLevel],
+        ghost_parameters: GhostParameters = None,
+        input_source: InputSource = idle_input,
+    ) -> BaseLevel:
+        """
+        :param level: class of the level
+        :param input_source: commands of the player
+        :return: the loaded level. Its units have no channel, so they are muted, and
+            its time is counted in ticks
+        """
+        level = level(
+            cellSize=self.cellSize,
+            worldSize=self.worldSize,
+            ghost_parameters=(
+                GhostParameters() if ghost_parameters is None else ghost_parameters
+            ),
+            score_system=self.score_system,
+            user_interface=InjectedUserInterface(input_source=input_source),
+            headless=True,
+            clock=SimulationClock(),
+        )
+        level.load_level()
+        return level
+
+    @staticmethod
+    def run_level(level: BaseLevel, max_ticks: int = None) -> int:
+        """
+        Update the level until it ends, or for max_ticks ticks.
+
+        :return: the number of ticks played
+        """
+        ticks = 0
+        while level.keep_running and (max_ticks is None or ticks < max_ticks):
+            level.update()
+            ticks += 1
+        return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how many ticks per second a level runs headless."
+    )
+    parser.add_argument("--level", choices=LEVELS, default="the_catacombs")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--difficulty", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rng.seed(args.seed)
+    ghost_parameters = GhostParameters()
+    ghost_parameters.change_difficulty(args.difficulty)
+    game = HeadlessGame()
+    level = game.load_level(LEVELS[args.level], ghost_parameters)
+
+    start = time.perf_counter()
+    ticks = game.run_level(level, max_ticks=args.ticks)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{args.level}: {ticks} ticks in {elapsed:.2f}s "
+        f"({ticks / elapsed:.0f} ticks/s), status: {level.game_status}"
+    )
+
+
+if __name__ == "__main__":
+    main()
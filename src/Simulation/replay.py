@@ -0,0 +1,219 @@
+import argparse
+import dataclasses
+import os
+import struct
+import time
+from typing import Optional
+
+import numpy as np
+from pygame import Vector2
+
+from src.Levels.base_level import BaseLevel
+from src.Simulation.headless import LEVELS, HeadlessGame, PlayerCommands
+from src.Units.ghosts import GhostParameters
+from src.random_numbers import rng
+from src.settings import RANDOM_SEED
+from src.user_interfaces import GameUserInterface
+
+# bump when the format of the files changes
+RECORDING_VERSION = 1
+# magic, version, seed, difficulty, attack and trap probabilities, length of the level id
+HEADER = struct.Struct("<4sBQBddB")
+MAGIC = b"QGRP"
+# commands of a tick, as bits of one byte: x and y of the move, attack and measure
+MOVE_CODES = {0: 0, 1: 1, -1: 2}
+MOVE_VALUES = {code: value for value, code in MOVE_CODES.items()}
+ATTACK_BIT = 1 << 4
+MEASURE_BIT = 1 << 5
+
+
+def encode_commands(commands: PlayerCommands) -> int:
+    return (
+        MOVE_CODES[int(commands.move[0])]
+        | MOVE_CODES[int(commands.move[1])] << 2
+        | ATTACK_BIT * bool(commands.attack)
+        | MEASURE_BIT * bool(commands.measure)
+    )
+
+
+def decode_commands(code: int) -> PlayerCommands:
+    return PlayerCommands(
+        move=Vector2(MOVE_VALUES[code & 3], MOVE_VALUES[code >> 2 & 3]),
+        attack=bool(code & ATTACK_BIT),
+        measure=bool(code & MEASURE_BIT),
+    )
+
+
+@dataclasses.dataclass
+class Recording:
+    """
+    A play session of a level: what is needed to set it up, and the commands of the
+    player at every tick, one byte each. Replaying the commands on a level set up the
+    same way plays exactly the same game.
+    """
+
+    level_id: str = None
+    seed: int = 0
+    difficulty: int = 3
+    attack_probability: float = 0.0
+    trap_probability: float = 0.0
+    commands: bytearray = dataclasses.field(default_factory=bytearray)
+
+    def ghost_parameters(self) -> GhostParameters:
+        return GhostParameters(
+            attack_probability=self.attack_probability,
+            trap_probability=self.trap_probability,
+            difficulty=self.difficulty,
+        )
+
+    def save(self, path: str) -> None:
+        level_id = self.level_id.encode()
+        with open(path, "wb") as file:
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    RECORDING_VERSION,
+                    self.seed,
+                    self.difficulty,
+                    self.attack_probability,
+                    self.trap_probability,
+                    len(level_id),
+                )
+            )
+            file.write(level_id)
+            file.write(self.commands)
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "rb") as file:
+            data = file.read()
+        (
+            magic,
+            version,
+            seed,
+            difficulty,
+            attack_probability,
+            trap_probability,
+            level_id_length,
+        ) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != RECORDING_VERSION:
+            raise ValueError(
+                f"{path} is not a recording of version {RECORDING_VERSION}"
+            )
+        level_id_end = HEADER.size + level_id_length
+        return cls(
+            level_id=data[HEADER.size : level_id_end].decode(),
+            seed=seed,
+            difficulty=difficulty,
+            attack_probability=attack_probability,
+            trap_probability=trap_probability,
+            commands=bytearray(data[level_id_end:]),
+        )
+
+
+class RecordingUserInterface(GameUserInterface):
+    """
+    The keyboard interface of the game, also writing the commands of every tick to a
+    recording.
+    """
+
+    def __init__(self, recording: Recording = None):
+        super().__init__()
+        self.recording = recording
+
+    def process_input(self):
+        keep_running = super().process_input()
+        # the tick on which the player quits has no command, as when replayed
+        if keep_running:
+            self.recording.commands.append(
+                encode_commands(
+                    PlayerCommands(
+                        move=self.movePlayerCommand,
+                        attack=self.attackCommand,
+                        measure=self.measureCommand,
+                    )
+                )
+            )
+        return keep_running
+
+
+def record_level(level: BaseLevel, seed: int = RANDOM_SEED) -> Recording:
+    """
+    Start recording a level, before it is loaded. The random numbers are seeded so
+    that the level can be replayed; its clock must count the time in ticks.
+
+    :param seed: the seed of the game, a random one if None
+    :return: the recording, filled as the level is played
+    """
+    if seed is None:
+        seed = int(np.random.default_rng().integers(2**63))
+    recording = Recording(
+        level_id=level.level_id,
+        seed=seed,
+        difficulty=level.ghost_parameters.difficulty,
+        attack_probability=level.ghost_parameters.attack_probability,
+        trap_probability=level.ghost_parameters.trap_probability,
+    )
+    level.user_interface = RecordingUserInterface(recording=recording)
+    rng.seed(seed)
+    return recording
+
+
+def recording_path(folder: str, recording: Recording) -> str:
+    os.makedirs(folder, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(folder, f"{recording.level_id}-{timestamp}.qgr")
+
+
+class ReplayInput:
+    """
+    Input source giving the commands of a recording, then quitting the level.
+    """
+
+    def __init__(self, recording: Recording = None):
+        self.commands = recording.commands
+        self.tick = 0
+
+    def __call__(self) -> Optional[PlayerCommands]:
+        if self.tick >= len(self.commands):
+            return None
+        commands = decode_commands(self.commands[self.tick])
+        self.tick += 1
+        return commands
+
+
+def replay(recording: Recording, game: HeadlessGame = None) -> BaseLevel:
+    """
+    Play a recording headless.
+
+    :return: the level, as it is at the end of the recording
+    """
+    game = HeadlessGame() if game is None else game
+    rng.seed(recording.seed)
+    level = game.load_level(
+        LEVELS[recording.level_id],
+        recording.ghost_parameters(),
+        input_source=ReplayInput(recording),
+    )
+    game.run_level(level)
+    return level
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game headless.")
+    parser.add_argument("recording", help="path of the .qgr file")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    start = time.perf_counter()
+    level = replay(recording)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{recording.level_id}: {len(recording.commands)} ticks in {elapsed:.2f}s, "
+        f"status: {level.game_status}, score: {level.level_score}, "
+        f"health: {level._player.health}"
+    )
+
+
+if __name__ == "__main__":
+    main()
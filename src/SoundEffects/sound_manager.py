@@ -1,12 +1,39 @@
+from functools import lru_cache
+from typing import Optional
+
 from pygame.mixer import Sound, music, Channel
 
 
+@lru_cache(maxsize=None)
+def load_sound(path: str) -> Sound:
+    """
+    Each sound file is loaded once, and shared by all the units playing it.
+    """
+    return Sound(path)
+
+
 class BaseSoundManager:
     def __init__(self, channel: Channel = None):
+        """
+        :param channel: where the sounds are played. Without a channel, e.g. in headless
+            simulations, the sound manager is muted and doesn't load any sound
+        """
         self.channel = channel
 
-    def play_sound(self, sound: str):
-        pass
+    @property
+    def is_muted(self) -> bool:
+        return self.channel is None
+
+    def load_sound(self, path: str) -> Optional[Sound]:
+        return None if self.is_muted else load_sound(path)
+
+    def play_sound(self, sound: Sound, loops: int = 0):
+        if not self.is_muted:
+            self.channel.play(sound, loops=loops)
+
+    def queue_sound(self, sound: Sound):
+        if not self.is_muted:
+            self.channel.queue(sound)
 
 
 class ScreenSoundManager(BaseSoundManager):
@@ -15,6 +42,8 @@ class ScreenSoundManager(BaseSoundManager):
         self.music: str = None
 
     def play_music(self):
+        if self.is_muted:
+            return
         music.stop()
         music.load(self.music)
         music.play(-1)
@@ -24,12 +53,12 @@ class MenuSoundManager(ScreenSoundManager):
     def __init__(self, channel: Channel = None):
         super().__init__(channel=channel)
         self.music = "src/SoundEffects/sound_effects/top-down-fantasy-1.ogg"
-        self.select_menu_item = Sound(
+        self.select_menu_item = self.load_sound(
             "src/SoundEffects/sound_effects/select_menu_item.wav"
         )
 
     def play_select_menu_item_sound(self):
-        self.channel.play(self.select_menu_item)
+        self.play_sound(self.select_menu_item)
 
 
 class LevelSoundManager(ScreenSoundManager):
@@ -42,52 +71,60 @@ class LevelSoundManager(ScreenSoundManager):
     ):
         super().__init__(channel=channel)
         self.music = music
-        self.load_level = Sound("src/SoundEffects/sound_effects/load_level.wav")
-        self.game_over = Sound("src/SoundEffects/sound_effects/game_over.wav")
-        self.game_won = Sound("src/SoundEffects/sound_effects/game_won.wav")
+        self.load_level = self.load_sound(
+            "src/SoundEffects/sound_effects/load_level.wav"
+        )
+        self.game_over = self.load_sound("src/SoundEffects/sound_effects/game_over.wav")
+        self.game_won = self.load_sound("src/SoundEffects/sound_effects/game_won.wav")
         self.background_sound = (
-            Sound(background_track_path) if background_track_path else None
+            self.load_sound(background_track_path) if background_track_path else None
         )
         self.extra_channel = extra_channel
-        if self.extra_channel:
+        if self.extra_channel and not self.is_muted:
             self.play_background_sound()
 
     def play_background_sound(self):
         self.extra_channel.play(self.background_sound, loops=-1)
 
     def play_load_level_sound(self):
-        self.channel.play(self.load_level)
+        self.play_sound(self.load_level)
 
     def play_game_over_sound(self):
-        self.channel.play(self.game_over)
+        self.play_sound(self.game_over)
 
     def play_game_won_sound(self):
-        self.channel.play(self.game_won)
+        self.play_sound(self.game_won)
 
 
 class PlayerSoundManager(BaseSoundManager):
     def __init__(self, channel: Channel = None):
         super().__init__(channel=channel)
-        self.attack_sound = Sound("src/SoundEffects/sound_effects/player_attack.wav")
-        self.measure_sound = Sound("src/SoundEffects/sound_effects/measure.wav")
-        self.ready_to_measure_sound = Sound(
+        self.attack_sound = self.load_sound(
+            "src/SoundEffects/sound_effects/player_attack.wav"
+        )
+        self.measure_sound = self.load_sound(
+            "src/SoundEffects/sound_effects/measure.wav"
+        )
+        self.ready_to_measure_sound = self.load_sound(
             "src/SoundEffects/sound_effects/before_measure_timer_resets.wav"
         )
 
     def play_attack_sound(self):
-        self.channel.queue(self.attack_sound)
+        self.queue_sound(self.attack_sound)
 
     def play_measure_sound(self):
-        self.channel.queue(self.measure_sound)
+        self.queue_sound(self.measure_sound)
 
     def play_ready_to_measure_sound(self):
-        self.channel.queue(self.ready_to_measure_sound)
+        self.queue_sound(self.ready_to_measure_sound)
 
 
 class GhostSoundManager(BaseSoundManager):
     def __init__(self, channel: Channel = None):
         super().__init__(channel=channel)
-        self.attack_sound = Sound("src/SoundEffects/sound_effects/ghost_hit.wav")
+        self.attack_sound = self.load_sound(
+            "src/SoundEffects/sound_effects/ghost_hit.wav"
+        )
 
     def play_attack_sound(self):
-        self.channel.queue(self.attack_sound)
+        self.queue_sound(self.attack_sound)
@@ -2,6 +2,7 @@ from pygame import Vector2, Rect
 from pygame.sprite import Sprite
 from pygame.mixer import Channel
 from src.SoundEffects.sound_manager import BaseSoundManager
+from src.Units.position import GridPosition
 from src.Units.utils import load_all_images_in_folder
 
 
@@ -33,12 +34,14 @@ class Unit(BaseUnit):
     ):
         """
         :param cellSize: cellSize is the size of each cell/block in the game
-        :param position: position on the map (in units of cells)
+        :param position: position on the map (in units of cells), any (x, y) pair
         """
         super().__init__()
         self.cellSize = cellSize
         self.worldSize = worldSize
-        self.position = position
+        self.position = GridPosition.of(position)
+        # position at the start of the tick, rendering interpolates from it
+        self.previous_position = self.position
         self.image = None
         self.rect = Rect(
             self.position.x * self.cellSize.x,
@@ -57,6 +60,25 @@ class Unit(BaseUnit):
             self.position.y * self.cellSize.y - self.rect.y,
         )
 
+    def save_previous_position(self) -> None:
+        self.previous_position = self.position
+
+    def interpolate(self, alpha: float = 1.0) -> None:
+        """
+        Place the sprite between its previous and current positions for rendering.
+        Units that jumped further than one cell are drawn where they are.
+
+        :param alpha: fraction of the next tick already elapsed, between 0 and 1
+        """
+        moved = self.position - self.previous_position
+        position = self.position.to_vector()
+        if moved.length_squared() <= 1:
+            position -= (1 - alpha) * moved
+        self.rect.topleft = (
+            round(position.x * self.cellSize.x),
+            round(position.y * self.cellSize.y),
+        )
+
     def is_unit_in_map(self) -> bool:
         if (
             self.rect.x < 0
@@ -0,0 +1,253 @@
+from typing import Optional, TYPE_CHECKING
+
+import numpy as np
+from pygame import Vector2
+
+from src.Levels.flow_field import FlowFields
+from src.Levels.visibility import VisibilityTable
+from src.Units.position import GridPosition
+from src.Units.splitter import GhostSplitter
+from src.random_numbers import rng
+from src.settings import GHOST_SPEED
+
+if TYPE_CHECKING:
+    from src.Units.ghosts import Ghost
+
+# the moves of a random walk, as in DIR_DICT
+RANDOM_MOVES = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])
+
+
+class GhostMovementEngine:
+    """
+    Moves all the visible ghosts of a level in one batched step.
+
+    The positions, last moves, waypoints and behaviour parameters of the ghosts are
+    stored as arrays, one row per ghost. Ghosts get a row when they are added and
+    give it back when they die. Every tick, the moves of all the ghosts are computed
+    at once with the same rules as Ghost.calculate_move_vector, and the Ghost sprites
+    only mirror the results for drawing and for the rest of the game logic.
+    """
+
+    def __init__(
+        self,
+        worldSize: Vector2 = None,
+        splitters: dict[GridPosition, GhostSplitter] = None,
+        capacity: int = 64,
+        flow_fields: FlowFields = None,
+        visibility: VisibilityTable = None,
+    ):
+        """
+        :param worldSize: size of the map
+        :param splitters: the ghost-splitters of the level, whose positions are the waypoints
+        :param capacity: initial number of rows, grown as needed
+        :param flow_fields: if given, ghosts follow the player and go to their waypoints
+            around the walls, instead of in a straight line
+        :param visibility: if given, ghosts only detect the player in sight
+        """
+        self.worldSize = worldSize
+        self.flow_fields = flow_fields
+        self.visibility = visibility
+        self.waypoint_positions = np.array(
+            [(position.x, position.y) for position in splitters], dtype=np.int64
+        ).reshape(-1, 2)
+        self.ghosts: list[Optional["Ghost"]] = []
+        self.free_rows: list[int] = []
+        self.rows: dict["Ghost", int] = {}
+
+        self.active = np.zeros(0, dtype=bool)
+        self.positions = np.zeros((0, 2), dtype=np.int64)
+        self.last_moves = np.zeros((0, 2), dtype=np.int64)
+        self.waypoints = np.zeros((0, 2), dtype=np.int64)
+        self.has_waypoint = np.zeros(0, dtype=bool)
+        self.follow_player_chance = np.zeros(0)
+        self.follow_waypoint_chance = np.zeros(0)
+        self.detect_player_radius = np.zeros(0)
+        self.player_direction_sign = np.zeros(0, dtype=np.int64)
+        self.grow(capacity)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def grow(self, capacity: int) -> None:
+        extra = capacity - len(self.active)
+        for name in (
+            "active",
+            "positions",
+            "last_moves",
+            "waypoints",
+            "has_waypoint",
+            "follow_player_chance",
+            "follow_waypoint_chance",
+            "detect_player_radius",
+            "player_direction_sign",
+        ):
+            array = getattr(self, name)
+            padding = np.zeros((extra,) + array.shape[1:], dtype=array.dtype)
+            setattr(self, name, np.concatenate([array, padding]))
+        self.free_rows += range(capacity - 1, len(self.ghosts) - 1, -1)
+        self.ghosts += [None] * extra
+
+    def add(self, ghost: "Ghost") -> None:
+        if not self.free_rows:
+            self.grow(2 * len(self.active))
+        row = self.free_rows.pop()
+        self.rows[ghost] = row
+        self.ghosts[row] = ghost
+
+        self.active[row] = True
+        self.positions[row] = (ghost.position.x, ghost.position.y)
+        self.last_moves[row] = (ghost.last_move.x, ghost.last_move.y)
+        self.has_waypoint[row] = ghost.waypoint is not None
+        if ghost.waypoint is not None:
+            self.waypoints[row] = (ghost.waypoint.x, ghost.waypoint.y)
+        self.follow_player_chance[row] = ghost.follow_player_chance
+        self.follow_waypoint_chance[row] = ghost.follow_waypoint_chance
+        self.detect_player_radius[row] = ghost.detect_player_radius
+        self.player_direction_sign[row] = ghost.player_direction_sign
+
+    def remove(self, ghost: "Ghost") -> None:
+        row = self.rows.pop(ghost, None)
+        if row is None:
+            return
+        self.ghosts[row] = None
+        self.active[row] = False
+        self.free_rows.append(row)
+
+    def choose_waypoints(self, rows: np.ndarray) -> None:
+        if not len(self.waypoint_positions):
+            return
+        chosen = rng.integers(len(self.waypoint_positions), size=len(rows))
+        self.waypoints[rows] = self.waypoint_positions[chosen]
+        self.has_waypoint[rows] = True
+
+    def compute_moves(
+        self, rows: np.ndarray, player_position: np.ndarray
+    ) -> np.ndarray:
+        positions = self.positions[rows]
+        uniforms = rng.uniforms(5 * len(rows)).reshape(len(rows), 5)
+
+        to_player = player_position - positions
+        player_distance_squared = np.sum(to_player**2, axis=1)
+        to_waypoint = self.waypoints[rows] - positions
+
+        is_moving = uniforms[:, 0] >= GHOST_SPEED
+        follows_player = (
+            is_moving
+            & (player_distance_squared <= self.detect_player_radius[rows] ** 2)
+            & (uniforms[:, 1] < self.follow_player_chance[rows])
+            & (player_distance_squared > 0)
+        )
+        if self.visibility is not None:
+            follows_player &= self.visibility.sees_all(positions, player_position)
+        follows_waypoint = (
+            is_moving
+            & ~follows_player
+            & (uniforms[:, 2] > self.follow_waypoint_chance[rows])
+            & np.any(to_waypoint != 0, axis=1)
+        )
+        walks_randomly = is_moving & ~follows_player & ~follows_waypoint
+
+        # step along x or y with probabilities direction.x**2 and direction.y**2
+        direction = np.where(
+            follows_player[:, None],
+            to_player * self.player_direction_sign[rows, None],
+            to_waypoint,
+        )
+        direction_squared = direction**2
+        along_x = (
+            uniforms[:, 3] * np.sum(direction_squared, axis=1) < direction_squared[:, 0]
+        )
+        steps = np.sign(direction)
+        steps[along_x, 1] = 0
+        steps[~along_x, 0] = 0
+        if self.flow_fields is not None:
+            self.steer_with_flow_fields(
+                rows, positions, follows_player, follows_waypoint, uniforms[:, 3], steps
+            )
+
+        moves = np.zeros_like(positions)
+        follows = follows_player | follows_waypoint
+        moves[follows] = steps[follows]
+        moves[walks_randomly] = RANDOM_MOVES[
+            (uniforms[walks_randomly, 4] * len(RANDOM_MOVES)).astype(int)
+        ]
+        return moves
+
+    def steer_with_flow_fields(
+        self,
+        rows: np.ndarray,
+        positions: np.ndarray,
+        follows_player: np.ndarray,
+        follows_waypoint: np.ndarray,
+        uniforms: np.ndarray,
+        steps: np.ndarray,
+    ) -> None:
+        """
+        Replace the straight-line steps by the steps of the flow field to the player
+        and of the routing table to the waypoints, where they have one.
+        """
+        player_field = self.flow_fields.player_field
+        if player_field is not None and follows_player.any():
+            # passive ghosts run away from the player
+            field_steps, has_step = player_field.steps(
+                positions[follows_player],
+                uniforms[follows_player],
+                away=self.player_direction_sign[rows][follows_player] < 0,
+            )
+            steered = np.flatnonzero(follows_player)[has_step]
+            steps[steered] = field_steps[has_step]
+
+        if follows_waypoint.any():
+            table_steps, has_step = self.flow_fields.routing_table.steps(
+                positions[follows_waypoint], self.waypoints[rows][follows_waypoint]
+            )
+            steered = np.flatnonzero(follows_waypoint)[has_step]
+            steps[steered] = table_steps[has_step]
+
+    def step(self, player) -> None:
+        """
+        Check the shots, then move every ghost.
+
+        :param player: instance of the Player class, chased by the ghosts
+        """
+        rows = np.flatnonzero(self.active)
+        if not len(rows):
+            return
+        if self.flow_fields is not None:
+            self.flow_fields.update_player(player.position)
+
+        for row in rows:
+            self.ghosts[row].check_if_hit_by_shot(weapon=player.weapon)
+
+        reached = ~self.has_waypoint[rows] | np.all(
+            self.positions[rows] == self.waypoints[rows], axis=1
+        )
+        self.choose_waypoints(rows[reached])
+
+        moves = self.compute_moves(
+            rows, np.array([player.position.x, player.position.y])
+        )
+        new_positions = self.positions[rows] + moves
+        # units can't leave the map
+        in_map = np.all(
+            (new_positions >= 0)
+            & (new_positions < (self.worldSize.x, self.worldSize.y)),
+            axis=1,
+        )
+        new_positions[~in_map] = self.positions[rows][~in_map]
+
+        changed = np.any(new_positions != self.positions[rows], axis=1) | np.any(
+            moves != self.last_moves[rows], axis=1
+        )
+        self.positions[rows] = new_positions
+        self.last_moves[rows] = moves
+        for row in rows[changed | reached]:
+            self.ghosts[row].mirror(
+                position=GridPosition(*self.positions[row]),
+                last_move=Vector2(*self.last_moves[row]),
+                waypoint=(
+                    GridPosition(*self.waypoints[row])
+                    if self.has_waypoint[row]
+                    else None
+                ),
+            )
@@ -8,13 +8,13 @@ from pygame.mixer import Channel
 from pygame.sprite import RenderUpdates
 from pygame.transform import scale
 from src.Units.base_unit import Unit
+from src.Units.ghost_engine import GhostMovementEngine
+from src.Units.position import GridPosition
 from src.Units.splitter import GhostSplitter
 from src.Units.trap import Trap
 from src.Units.utils import (
     two_ghost_coming_from_different_sides_of_splitter,
-    beam_splitter,
     is_in_given_radius,
-    find_tensored_components,
 )
 from src.settings import (
     GHOST_ATTACK_RADIUS,
@@ -22,12 +22,14 @@ from src.settings import (
     PROB_GHOST_TRAP,
     MAX_DIFFICULTY,
 )
-from src.settings import GHOST_SPEED, MAX_GHOSTS_PER_STATE
+from src.settings import GHOST_SPEED, MAX_GHOST_PARTS
 from src.SoundEffects.sound_manager import GhostSoundManager
-
-from qutip import ket, tensor, qeye
+from src.Quantum.utils import create_quantum_state
+from src.random_numbers import rng
 
 DIR_DICT = {"L": (-1, 0), "R": (1, 0), "D": (0, -1), "U": (0, 1)}
+# a ghost is hit by the shots at most this far away
+SHOT_HIT_RADIUS = 0.5
 
 
 class Ghost(Unit):
@@ -38,7 +40,7 @@ class Ghost(Unit):
         position: Vector2 = None,
         last_move: Vector2 = None,
         channel: Channel = None,
-        splitters: GhostSplitter = None,
+        splitters: dict[GridPosition, GhostSplitter] = None,
     ):
         """
         :param cellSize: cellSize is the size of each cell/block in the game
@@ -53,7 +55,6 @@ class Ghost(Unit):
         self.image = scale(self.image, self.cellSize)
         self.splitters = splitters
         self.waypoint = None
-        self.random_generator = np.random.default_rng()
 
         self.sound_manager = GhostSoundManager(channel=self.channel)
         self.last_move = last_move if last_move else Vector2(-1, 0)
@@ -62,18 +63,19 @@ class Ghost(Unit):
         self.prob_ghost_attack = 0.5
         self.follow_waypoint_chance = 0.5
         self.detect_player_radius = self.attack_radius + 3
+        # -1 for ghosts running away from the player
+        self.player_direction_sign = 1
         self.is_alive = True
 
     def set_waypoint(self):
-        self.waypoint = np.random.choice(self.splitters).position
+        positions = list(self.splitters)
+        self.waypoint = rng.choice(positions)
 
     def choose_move_vector(self, direction: Vector2) -> Vector2:
-        moveVector = self.random_generator.choice(
-            [(sign(direction.x), 0), (0, sign(direction.y))],
-            p=[abs(direction.x) ** 2, abs(direction.y) ** 2],
-        )
-        moveVector = Vector2(moveVector[0], moveVector[1])
-        return moveVector
+        # direction is normalized, so direction.x**2 + direction.y**2 = 1
+        if rng.uniform() < direction.x**2:
+            return Vector2(sign(direction.x), 0)
+        return Vector2(0, sign(direction.y))
 
     def walk_to_waypoint(self) -> Vector2:
         direction = (self.waypoint - self.position).normalize()
@@ -81,46 +83,64 @@ class Ghost(Unit):
 
     def walk_to_player(self, player_position: Vector2 = None) -> Vector2:
         direction = (player_position - self.position).normalize()
-        return self.choose_move_vector(direction)
+        return self.choose_move_vector(self.player_direction_sign * direction)
 
     def calculate_move_vector(self, player=None) -> Vector2:
-        if np.random.random() < GHOST_SPEED:
+        if rng.uniform() < GHOST_SPEED:
             return Vector2(0, 0)
 
         if (
             is_in_given_radius(
-                player.position, self.position, radius=self.detect_player_radius
+                player.position,
+                self.position,
+                radius=self.detect_player_radius,
+                visibility=player.visibility,
             )
-            and np.random.random() < self.follow_player_chance
-            and not np.allclose(player.position, self.position)
+            and rng.uniform() < self.follow_player_chance
+            and player.position != self.position
         ):
             moveVector = self.walk_to_player(player_position=player.position)
-        elif np.random.random() > self.follow_waypoint_chance and not np.allclose(
-            self.position, self.waypoint
+        elif (
+            rng.uniform() > self.follow_waypoint_chance
+            and self.position != self.waypoint
         ):
             moveVector = self.walk_to_waypoint()
         else:
-            x, y = DIR_DICT[np.random.choice(list(DIR_DICT.keys()))]
+            x, y = DIR_DICT[rng.choice(list(DIR_DICT.keys()))]
             moveVector = Vector2(x, y)
 
         return moveVector
 
-    def check_if_hit_by_shot(self, shots=None):
-        for shot in shots:
-            if (shot.position - self.position).length() <= 0.5:
-                self.is_alive = False
-                shot.is_alive = False
-                break
+    def check_if_hit_by_shot(self, weapon=None):
+        for shot in weapon.shots_within(self.position, SHOT_HIT_RADIUS):
+            self.is_alive = False
+            shot.is_alive = False
+            break
 
     def update(self, player):
-        if not self.waypoint or np.allclose(self.position, self.waypoint):
+        if self.waypoint is None or self.position == self.waypoint:
             self.set_waypoint()  # make sure it is a different waypoint
 
-        self.check_if_hit_by_shot(shots=player.weapon.shots)
+        self.check_if_hit_by_shot(weapon=player.weapon)
         moveVector = self.calculate_move_vector(player=player)
         super().update(moveVector=moveVector)
         self.last_move = moveVector
 
+    def mirror(
+        self,
+        position: GridPosition = None,
+        last_move: Vector2 = None,
+        waypoint: GridPosition = None,
+    ) -> None:
+        """
+        Take the state computed for this ghost by a GhostMovementEngine,
+        which replaces update.
+        """
+        if position != self.position:
+            self.move(moveVector=position - self.position)
+        self.last_move = last_move
+        self.waypoint = waypoint
+
 
 class AggressiveGhost(Ghost):
     def __init__(
@@ -130,7 +150,7 @@ class AggressiveGhost(Ghost):
         position: Vector2 = None,
         last_move: Vector2 = None,
         channel: Channel = None,
-        splitters: GhostSplitter = None,
+        splitters: dict[GridPosition, GhostSplitter] = None,
     ):
         super().__init__(
             cellSize=cellSize,
@@ -155,7 +175,7 @@ class PassiveGhost(Ghost):
         position: Vector2 = None,
         last_move: Vector2 = None,
         channel: Channel = None,
-        splitters: GhostSplitter = None,
+        splitters: dict[GridPosition, GhostSplitter] = None,
     ):
         super().__init__(
             cellSize=cellSize,
@@ -170,10 +190,7 @@ class PassiveGhost(Ghost):
         self.attack_radius = GHOST_ATTACK_RADIUS - 2
         self.prob_ghost_attack = 0.5
         self.detect_player_radius = GHOST_ATTACK_RADIUS + 4
-
-    def walk_to_player(self, player_position: Vector2 = None) -> Vector2:
-        moveVector = super().walk_to_player(player_position=player_position)
-        return -moveVector
+        self.player_direction_sign = -1
 
 
 @dataclasses.dataclass
@@ -204,29 +221,31 @@ class QGhost(Ghost):
         cellSize: Vector2 = None,
         worldSize: Vector2 = None,
         position: Vector2 = None,
-        splitters: list[GhostSplitter] = None,
+        splitters: dict[GridPosition, GhostSplitter] = None,
         render_group: RenderUpdates = None,
         channel: Channel = None,
         ghost_parameters: GhostParameters = None,
+        ghost_engine: GhostMovementEngine = None,
     ):
         """
         :param cellSize: cellSize is the size of each cell/block in the game
         :param worldSize: size of the map
         :param position: position on the map (in units of cells)
         :param render_group: a pointer to the visualisation parameters
+        :param ghost_engine: moves the visible parts, if not given they move in their own update
         """
         super().__init__(
             cellSize=cellSize, worldSize=worldSize, position=position, channel=channel
         )
         # initialize it in |1>. Allow maximum MAX_GHOSTS_PER_STATE ghosts in one state
-        self.quantum_state = ket([1], MAX_GHOSTS_PER_STATE)
+        self.quantum_state = create_quantum_state([1])
         self.visible_parts: [Ghost] = []
         self.dead_ghosts: [Ghost] = []
         self.cellSize = cellSize
         self.splitters = splitters
         self.render_group = render_group
+        self.ghost_engine = ghost_engine
         self.possible_ghosts = [AggressiveGhost, PassiveGhost]
-        self.random_generator = np.random.default_rng()
         self.add_visible_ghost(start_position=position)
         self.options = (
             GhostParameters() if ghost_parameters is None else ghost_parameters
@@ -238,21 +257,16 @@ class QGhost(Ghost):
             return False
         for i, ghost in enumerate(self.visible_parts):
             if is_in_given_radius(
-                player.position, ghost.position, player.measure_radius
+                player.position,
+                ghost.position,
+                player.measure_radius,
+                visibility=player.visibility,
             ):
-                probs = np.abs(self.quantum_state.full()[:, 0]) ** 2
                 # choose one vector to survive based on its probability
-                surviving_state_idx = np.random.choice(
-                    list(range(MAX_GHOSTS_PER_STATE**n_ghosts)),
-                    p=probs / np.sum(probs),
-                )
-                numbers_of_ghosts_here = find_tensored_components(
-                    surviving_state_idx, n_ghosts
-                )
+                numbers_of_ghosts_here = self.quantum_state.sample_occupations()
 
-                self.quantum_state = ket(
-                    numbers_of_ghosts_here[numbers_of_ghosts_here > 0],
-                    MAX_GHOSTS_PER_STATE,
+                self.quantum_state = create_quantum_state(
+                    numbers_of_ghosts_here[numbers_of_ghosts_here > 0]
                 )
                 surviving_state_index = set(np.where(numbers_of_ghosts_here > 0)[0])
                 for k in range(n_ghosts - 1, -1, -1):
@@ -263,6 +277,19 @@ class QGhost(Ghost):
                 return True
         return False
 
+    def compact_quantum_state(self) -> None:
+        """
+        Visible parts where the ghost is almost surely not are removed,
+        together with their modes, so that the state only tracks actual ghosts.
+        """
+        vacuum_modes = self.quantum_state.compact()
+        if not vacuum_modes:
+            return
+        for k in vacuum_modes:
+            self.visible_parts[k].is_alive = False
+        # the state is already updated, as after a measurement
+        self.remove_visible_ghosts(is_measurement=True)
+
     def remove_visible_ghosts(self, is_measurement: bool = False):
         initially_alive_ghosts = self.visible_parts
         alive_ghosts = []
@@ -274,6 +301,8 @@ class QGhost(Ghost):
             else:
                 dead_ghosts.append(ghost)
                 self.render_group.remove(ghost)
+                if self.ghost_engine is not None:
+                    self.ghost_engine.remove(ghost)
 
         self.dead_ghosts = dead_ghosts
         if not is_measurement:
@@ -283,7 +312,7 @@ class QGhost(Ghost):
     def add_visible_ghost(
         self, start_position: Vector2 = None, last_move: Vector2 = None
     ):
-        ghost_type = self.random_generator.choice(self.possible_ghosts)
+        ghost_type = rng.choice(self.possible_ghosts)
         ghost = ghost_type(
             cellSize=self.cellSize,
             worldSize=self.worldSize,
@@ -294,6 +323,8 @@ class QGhost(Ghost):
         )
         self.visible_parts.append(ghost)
         self.render_group.add(ghost)
+        if self.ghost_engine is not None:
+            self.ghost_engine.add(ghost)
 
     def attack(self, player) -> None:
         """
@@ -302,100 +333,92 @@ class QGhost(Ghost):
         """
         attack_prob = 0
         for i, ghost in enumerate(self.visible_parts):
-            if is_in_given_radius(player.position, ghost.position, ghost.attack_radius):
-                p_not_here = (
-                    tensor(
-                        [
-                            ket([0], MAX_GHOSTS_PER_STATE).dag()
-                            if g == i
-                            else qeye(MAX_GHOSTS_PER_STATE)
-                            for g in range(len(self.visible_parts))
-                        ]
-                    )
-                    * self.quantum_state
-                ).norm()
+            if is_in_given_radius(
+                player.position,
+                ghost.position,
+                ghost.attack_radius,
+                visibility=player.visibility,
+            ):
+                # norm of the state projected on "no ghost here", only read when
+                # needed, since reading it applies the pending beam splitters
+                p_not_here = np.sqrt(self.quantum_state.vacuum_probability(i))
                 attack_prob += (1 - p_not_here) * ghost.prob_ghost_attack
-        if np.random.random() <= attack_prob:
+        if rng.uniform() <= attack_prob:
             player.health -= 1
             self.sound_manager.play_attack_sound()
 
-    def lay_trap(self, traps: list[Trap]) -> None:
-        trap_laying_ghost = np.random.choice(self.visible_parts)
-        for trap in traps:
-            # check if position already taken
-            if trap.position == trap_laying_ghost.position:
-                return
+    def lay_trap(self, traps: dict[GridPosition, Trap]) -> None:
+        if not self.visible_parts:
+            return
+        trap_laying_ghost = rng.choice(self.visible_parts)
+        # check if position already taken
+        if trap_laying_ghost.position in traps:
+            return
         trap = Trap(
             cellSize=self.cellSize,
             worldSize=self.worldSize,
             position=trap_laying_ghost.position,
             channel=self.channel,
         )
-        traps.append(trap)
+        traps[trap.position] = trap
 
     def destroy_dead_ghosts_quantum_state(self, old_visible):
         if not self.dead_ghosts:
             return
-        new_state = (
-            tensor(
-                [
-                    ket([0], MAX_GHOSTS_PER_STATE).dag()
-                    if ghost in self.dead_ghosts
-                    else qeye(MAX_GHOSTS_PER_STATE)
-                    for ghost in old_visible
-                ]
-            )
-            * self.quantum_state
-        )
-
-        if new_state.norm():
-            self.quantum_state = new_state.unit()
-        else:
+        dead_modes = [
+            i for i, ghost in enumerate(old_visible) if ghost in self.dead_ghosts
+        ]
+        if not self.quantum_state.project_out(dead_modes):
             self.is_alive = False
 
     def interact_with_splitter(self) -> None:
         seen = set()
-        for splitter in self.splitters:
-            for i, this_ghost in enumerate(self.visible_parts[:]):
-                if i in seen:
-                    continue
-                if np.allclose(splitter.position, this_ghost.position, 1e-2):
-                    is_coincidence = False
-                    for j, other_ghost in enumerate(self.visible_parts[i:]):
-                        # check 2 ghosts at the same tile case
-                        if two_ghost_coming_from_different_sides_of_splitter(
-                            this_ghost, other_ghost, splitter.splitterType
-                        ):
-                            is_coincidence = True
-                            self.quantum_state = beam_splitter(self.quantum_state, i, j)
-                            seen |= {i, i + j}
-                    if not is_coincidence:
-                        last_move = (-1) ** (splitter.splitterType == "45") * Vector2(
-                            this_ghost.last_move.y, this_ghost.last_move.x
-                        )
-
-                        self.add_visible_ghost(
-                            start_position=this_ghost.position, last_move=last_move
-                        )
-                        self.quantum_state = beam_splitter(self.quantum_state, i)
+        for i, this_ghost in enumerate(self.visible_parts[:]):
+            splitter = self.splitters.get(this_ghost.position)
+            if i in seen or splitter is None:
+                continue
+            is_coincidence = False
+            for j, other_ghost in enumerate(self.visible_parts[i:]):
+                # check 2 ghosts at the same tile case
+                if two_ghost_coming_from_different_sides_of_splitter(
+                    this_ghost, other_ghost, splitter.splitterType
+                ):
+                    is_coincidence = True
+                    self.quantum_state = self.quantum_state.beam_splitter(i, i + j)
+                    seen |= {i, i + j}
+            if not is_coincidence:
+                last_move = (-1) ** (splitter.splitterType == "45") * Vector2(
+                    this_ghost.last_move.y, this_ghost.last_move.x
+                )
+
+                self.add_visible_ghost(
+                    start_position=this_ghost.position, last_move=last_move
+                )
+                self.quantum_state = self.quantum_state.beam_splitter(i)
 
     def update(self, player, traps) -> None:
         """
         After all the ghosts are in position, we can:
             1. change their state if they hit the splitter
-            2. let them attack the player
+            2. kill the ghost once all its visible parts are destroyed
+            3. let them attack the player, or lay a trap
 
         :param player: instance of the Player class carrying information about player's position & health
         """
-        if len(self.visible_parts) < MAX_GHOSTS_PER_STATE:
+        if len(self.visible_parts) < MAX_GHOST_PARTS:
             self.interact_with_splitter()
 
         self.remove_visible_ghosts()
+        if self.is_alive:
+            self.compact_quantum_state()
 
-        if np.random.random() <= self.options.attack_probability:
-            self.attack(player)
-        elif np.random.random() <= self.options.trap_probability:
-            self.lay_trap(traps)
-
+        # checked before attacking or laying a trap, which pick one of the visible
+        # parts and would fail on an empty list
         if not self.visible_parts:
             self.is_alive = False
+            return
+
+        if rng.uniform() <= self.options.attack_probability:
+            self.attack(player)
+        elif rng.uniform() <= self.options.trap_probability:
+            self.lay_trap(traps)
@@ -1,14 +1,15 @@
-import time
 import math
-import numpy as np
 
-from pytmx import TiledMap
 from pygame import Vector2
 from pygame.image import load
 from pygame.mixer import Channel
 from pygame.transform import scale
 
+from src.Levels.clock import LevelClock, RealTimeClock
+from src.Levels.collision_grid import CollisionGrid, WALL, DONT_PASS
+from src.Levels.visibility import VisibilityTable
 from src.SoundEffects.sound_manager import PlayerSoundManager
+from src.Units.position import GridPosition
 from src.Units.splitter import GhostSplitter
 from src.Units.trap import Trap
 from src.Units.weapon import Weapon
@@ -29,14 +30,20 @@ class Player(Unit):
         worldSize: Vector2 = None,
         position: Vector2 = None,
         channel: Channel = None,
-        map_data: TiledMap = None,
-        does_map_have_tile_dont_pass: bool = None,
-        splitters: [GhostSplitter] = None,
+        collision_grid: CollisionGrid = None,
+        splitters: dict[GridPosition, GhostSplitter] = None,
+        visibility: VisibilityTable = None,
+        clock: LevelClock = None,
     ):
         """
         :param cellSize: cellSize is the size of each cell/block in the game
         :param worldSize: size of the map
         :param position: position on the map (in units of cells)
+        :param collision_grid: blocking tiles of the map
+        :param splitters: the ghost-splitters of the level, by position
+        :param visibility: lines of sight of the map, ghosts behind walls are
+            neither measured nor attacking. If not given, walls don't block the view
+        :param clock: time of the level, for the measure cooldown
         """
         super().__init__(
             cellSize=cellSize, worldSize=worldSize, position=position, channel=channel
@@ -52,7 +59,8 @@ class Player(Unit):
         self.max_health = PLAYER_INITIAL_HEALTH
         self.health = PLAYER_INITIAL_HEALTH
         self.min_measure_time = PLAYER_MEASURE_TIME
-        self.last_measure_time: int = 0
+        # as if the last measure was long enough ago, the player can measure right away
+        self.last_measure_time: int = -self.min_measure_time
         self.ready_to_measure: bool = True
 
         # score variables
@@ -61,15 +69,16 @@ class Player(Unit):
         self.visible_ghosts_killed: int = 0
 
         # functionality variables
-        self.map_data = map_data
-        self.does_map_have_tile_dont_pass = does_map_have_tile_dont_pass
+        self.collision_grid = collision_grid
         self.splitters = splitters
+        self.visibility = visibility
+        self.clock = RealTimeClock() if clock is None else clock
         self.weapon = Weapon(
             cellSize=self.cellSize,
             worldSize=self.worldSize,
             position=self.position,
             channel=self.channel,
-            map_data=self.map_data,
+            collision_grid=self.collision_grid,
         )
 
     def attack(self):
@@ -88,7 +97,7 @@ class Player(Unit):
             for qghost in qghosts:
                 if qghost.collapse_wave_function(player=self):
                     self.sound_manager.play_measure_sound()
-                    self.last_measure_time = int(time.time())
+                    self.last_measure_time = int(self.clock.now())
                     self.ready_to_measure = False
                     self.weapon.measurer.measure(position=self.position)
                     break
@@ -102,29 +111,15 @@ class Player(Unit):
             self.image = rotate(self.image, angle)
 
     def collides_with_wall(self):
-        walls = self.map_data.layernames["Walls"].tiles()
-        for x, y, _ in walls:
-            if np.allclose(self.position, Vector2(x, y)):
-                return True
-        for splitter in self.splitters:
-            if np.allclose(self.position, splitter.position):
-                return True
-        return False
+        if self.collision_grid.collides(self.position, WALL):
+            return True
+        return self.position in self.splitters
 
     def collides_with_splitter(self):
-        for splitter in self.splitters:
-            if np.allclose(self.position, splitter.position):
-                return True
-        return False
+        return self.position in self.splitters
 
     def collides_with_non_walkable_floor(self):
-        if not self.does_map_have_tile_dont_pass:
-            return False
-        floors = self.map_data.layernames["TileDontPass"].tiles()
-        for x, y, _ in floors:
-            if np.allclose(self.position, Vector2(x, y)):
-                return True
-        return False
+        return self.collision_grid.collides(self.position, DONT_PASS)
 
     def collides_with_anything(self):
         check_collision_functions = [
@@ -139,7 +134,7 @@ class Player(Unit):
 
     def check_measure_time(self):
         check_if_able_to_measure = (
-            int(time.time() - self.last_measure_time) > self.min_measure_time
+            int(self.clock.now() - self.last_measure_time) > self.min_measure_time
         )
         if not self.ready_to_measure and check_if_able_to_measure:
             self.sound_manager.play_ready_to_measure_sound()
@@ -183,13 +178,12 @@ class Player(Unit):
             shots_group=shots_group,
         )
 
-    def check_if_on_trap(self, traps: list[Trap] = None):
-        for trap in traps:
-            if np.allclose(self.position, trap.position) and trap.is_alive:
-                self.health -= 1
-                self.num_of_fallen_traps += 1
-                trap.is_alive = False
-                break
+    def check_if_on_trap(self, traps: dict[GridPosition, Trap] = None):
+        trap = traps.get(self.position)
+        if trap is not None and trap.is_alive:
+            self.health -= 1
+            self.num_of_fallen_traps += 1
+            trap.is_alive = False
 
     def check_if_killed_visible_ghost(self, ghosts_group):
         for qghost in ghosts_group:
@@ -0,0 +1,102 @@
+from typing import Optional, Sequence
+
+from pygame import Vector2
+
+
+class GridPosition:
+    """
+    Position on the map in units of cells, stored as integer numbers of half cells:
+    units stand on cells and shots move by half cells, so no other positions exist.
+
+    Positions are immutable, hashable and compared exactly, so they can be used as
+    dictionary keys. Adding a move gives a new position, and the difference of two
+    positions is a Vector2, as are the float coordinates used for rendering.
+    """
+
+    __slots__ = ("half_x", "half_y")
+
+    def __init__(self, x: float = 0, y: float = 0):
+        """
+        :param x: coordinates in units of cells, rounded to the nearest half cell
+        """
+        self.half_x = int(round(2 * x))
+        self.half_y = int(round(2 * y))
+
+    @classmethod
+    def from_half_cells(cls, half_x: int, half_y: int) -> "GridPosition":
+        position = cls.__new__(cls)
+        position.half_x = half_x
+        position.half_y = half_y
+        return position
+
+    @classmethod
+    def of(cls, position: Sequence[float]) -> "GridPosition":
+        """
+        :param position: a GridPosition, returned as is, or any (x, y) pair such as a Vector2
+        """
+        if isinstance(position, cls):
+            return position
+        return cls(position[0], position[1])
+
+    @property
+    def x(self) -> float:
+        return self.half_x / 2
+
+    @property
+    def y(self) -> float:
+        return self.half_y / 2
+
+    @property
+    def cell(self) -> Optional[tuple[int, int]]:
+        """
+        :return: the (x, y) cell of the position, None if it lies between two cells
+        """
+        if self.half_x % 2 or self.half_y % 2:
+            return None
+        return self.half_x // 2, self.half_y // 2
+
+    def to_vector(self) -> Vector2:
+        return Vector2(self.x, self.y)
+
+    def distance_squared_to(self, other: Sequence[float]) -> float:
+        other = GridPosition.of(other)
+        return (
+            (self.half_x - other.half_x) ** 2 + (self.half_y - other.half_y) ** 2
+        ) / 4
+
+    def __add__(self, move: Sequence[float]) -> "GridPosition":
+        move = GridPosition.of(move)
+        return GridPosition.from_half_cells(
+            self.half_x + move.half_x, self.half_y + move.half_y
+        )
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Sequence[float]) -> Vector2:
+        return Vector2(self.x - other[0], self.y - other[1])
+
+    def __rsub__(self, other: Sequence[float]) -> Vector2:
+        return Vector2(other[0] - self.x, other[1] - self.y)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, GridPosition):
+            return self.half_x == other.half_x and self.half_y == other.half_y
+        if isinstance(other, (Vector2, tuple, list)) and len(other) == 2:
+            return self.x == other[0] and self.y == other[1]
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.half_x, self.half_y))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, index: int) -> float:
+        return (self.x, self.y)[index]
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __repr__(self) -> str:
+        return f"GridPosition({self.x}, {self.y})"
@@ -1,9 +1,25 @@
-import numpy as np
+from functools import lru_cache
+
 from pygame import Vector2, Rect
 from pygame.mixer import Channel
-from pytmx import TiledMap
 
+from src.Levels.collision_grid import CollisionGrid, WALL
 from src.Units.base_unit import Unit, AnimatedUnit
+from src.Units.position import GridPosition
+
+
+@lru_cache(maxsize=None)
+def half_cell_offsets(radius: float) -> list[GridPosition]:
+    """
+    All the moves by whole half cells of length at most radius.
+    """
+    reach = int(2 * radius)
+    return [
+        GridPosition.from_half_cells(half_x, half_y)
+        for half_x in range(-reach, reach + 1)
+        for half_y in range(-reach, reach + 1)
+        if half_x**2 + half_y**2 <= (2 * radius) ** 2
+    ]
 
 
 class Weapon(Unit):
@@ -13,7 +29,7 @@ class Weapon(Unit):
         worldSize: Vector2 = None,
         position: Vector2 = None,
         channel: Channel = None,
-        map_data: TiledMap = None,
+        collision_grid: CollisionGrid = None,
     ):
         """
         :param cellSize: cellSize is the size of each cell/block in the game
@@ -23,9 +39,11 @@ class Weapon(Unit):
         super().__init__(
             cellSize=cellSize, worldSize=worldSize, position=position, channel=channel
         )
-        self.map_data = map_data
+        self.collision_grid = collision_grid
         self.shots: [Shot] = []
         self.dead_shots: [Shot] = []
+        # alive shots by position, rebuilt every tick
+        self.shots_by_position: dict[GridPosition, list[Shot]] = {}
         self.measurer = Measurement(
             cellSize=cellSize, worldSize=worldSize, position=position, channel=channel
         )
@@ -38,17 +56,33 @@ class Weapon(Unit):
             position=self.position + direction,
             direction=direction,
             channel=self.channel,
-            map_data=self.map_data,
+            collision_grid=self.collision_grid,
         )
         self.shots.append(shot)
+        self.index_shot(shot)
+
+    def index_shot(self, shot: "Shot") -> None:
+        self.shots_by_position.setdefault(shot.position, []).append(shot)
+
+    def shots_within(self, position: GridPosition, radius: float) -> list["Shot"]:
+        """
+        Shots at most radius away from the position, only looking at the positions
+        in range instead of at every shot.
+        """
+        shots = []
+        for offset in half_cell_offsets(radius):
+            shots += self.shots_by_position.get(position + offset, [])
+        return shots
 
     def update(self) -> None:
         alive_shots = []
         dead_shots = []
+        self.shots_by_position = {}
         for shot in self.shots:
             shot.update()
             if shot.is_alive:
                 alive_shots.append(shot)
+                self.index_shot(shot)
             else:
                 dead_shots.append(shot)
 
@@ -64,7 +98,7 @@ class Shot(AnimatedUnit):
         position: Vector2 = None,
         direction: Vector2 = None,
         channel: Channel = None,
-        map_data: TiledMap = None,
+        collision_grid: CollisionGrid = None,
     ):
         """
         :param cellSize: cellSize is the size of each cell/block in the game
@@ -80,16 +114,12 @@ class Shot(AnimatedUnit):
             images_name="shot",
         )
 
-        self.map_data = map_data
+        self.collision_grid = collision_grid
         self.direction = direction
         self.is_alive = True
 
     def collides_with_wall(self):
-        walls = self.map_data.layernames["Walls"].tiles()
-        for x, y, _ in walls:
-            if np.allclose(self.position, Vector2(x, y)):
-                return True
-        return False
+        return self.collision_grid.collides(self.position, WALL)
 
     def update(self) -> None:
         self.move(moveVector=self.direction / 2)
@@ -1,10 +1,20 @@
+import time
+
 import pygame
 from pygame import Vector2
 from src.Levels.base_level import BaseLevel
+from src.Levels.clock import SimulationClock
 from src.Menus.menu import MenusManager
 from src.SoundEffects.sound_manager import ScreenSoundManager
 from src.Units.ghosts import GhostParameters
 from src.Score.score import ScoreSystem
+from src.Simulation.replay import Recording, record_level, recording_path
+from src.settings import (
+    TICKS_PER_SECOND,
+    MAX_TICKS_PER_FRAME,
+    FRAMES_PER_SECOND,
+    RECORDINGS_FOLDER,
+)
 
 
 class GameState:
@@ -45,6 +55,7 @@ class GameState:
         self.last_game_id: str = None
         self.last_game_name: str = None
         self.has_level_ended: bool = False
+        self.recording: Recording = None
 
     def load_level(self, level: BaseLevel, ghost_parameters: GhostParameters = None):
         self.last_game_status = None
@@ -59,13 +70,20 @@ class GameState:
             enemies_channel=self.enemies_channel,
             ghost_parameters=ghost_parameters,
             score_system=self.score_system,
+            # GameState.run plays fixed ticks, so the level time is counted in ticks
+            clock=SimulationClock(),
         )
+        if RECORDINGS_FOLDER:
+            self.recording = record_level(self.level)
         self.level.load_level()
         self.last_game_id = self.level.level_id
         self.last_game_name = self.level.level_title
 
     def unload_level(self):
         self.last_game_score = self.level.level_score
+        if self.recording is not None:
+            self.recording.save(recording_path(RECORDINGS_FOLDER, self.recording))
+            self.recording = None
         self.level = None
         self.setup_game_window()
         self.setup_game_music(self.menu.music)
@@ -106,16 +124,38 @@ class GameState:
                 self.load_level(level, self.menu.settings.ghost_parameters)
             self.running = self.menu.keep_running
 
-    def render(self):
+    def render(self, alpha: float = 1.0):
         self.window.fill((0, 0, 0))
         if self.level:
-            self.level.render()
+            self.level.render(alpha=alpha)
         else:
             self.menu.render()
         pygame.display.update()
 
     def run(self):
+        """
+        The game is updated TICKS_PER_SECOND times per second of real time, whatever
+        the frame rate: the time elapsed since the last frame is played as fixed ticks,
+        and rendering interpolates between the last two ticks.
+        """
+        tick_duration = 1 / TICKS_PER_SECOND
+        # real time not played yet
+        lag = 0.0
+        last_frame_time = time.perf_counter()
         while self.running:
-            self.update()
-            self.render()
-            self.clock.tick(60)
+            now = time.perf_counter()
+            lag += now - last_frame_time
+            last_frame_time = now
+
+            ticks = 0
+            while lag >= tick_duration and self.running:
+                if ticks == MAX_TICKS_PER_FRAME:
+                    # too far behind, slow down instead of never catching up
+                    lag = 0.0
+                    break
+                self.update()
+                lag -= tick_duration
+                ticks += 1
+
+            self.render(alpha=lag / tick_duration)
+            self.clock.tick(FRAMES_PER_SECOND)
@@ -0,0 +1,75 @@
+from typing import Optional, Sequence, TypeVar
+
+import numpy as np
+
+from src.settings import RANDOM_SEED, RNG_BLOCK_SIZE
+
+T = TypeVar("T")
+
+
+class RandomNumbers:
+    """
+    The one source of randomness of the game, so that a seed makes a whole game reproducible.
+
+    A block of uniform numbers is drawn from a single numpy Generator at the start of
+    every tick, and the subsystems take consecutive slices of it, instead of each of
+    them calling into its own generator. The block is extended if a tick needs more.
+    """
+
+    def __init__(
+        self, seed: Optional[int] = RANDOM_SEED, block_size: int = RNG_BLOCK_SIZE
+    ):
+        """
+        :param seed: seed of the generator, None for a random one
+        :param block_size: number of uniform numbers drawn at once
+        """
+        self.block_size = block_size
+        self.seed(seed)
+
+    def seed(self, seed: Optional[int] = None) -> None:
+        self.generator = np.random.default_rng(seed)
+        self.block = np.empty(0)
+        self.offset = 0
+
+    def new_tick(self) -> None:
+        """
+        Draw the block of the next tick, dropping what is left of the previous one.
+        """
+        self.block = self.generator.random(self.block_size)
+        self.offset = 0
+
+    def uniforms(self, size: int) -> np.ndarray:
+        """
+        :return: size uniform numbers in [0, 1)
+        """
+        if self.offset + size > len(self.block):
+            self.block = np.concatenate(
+                [
+                    self.block[self.offset :],
+                    self.generator.random(max(self.block_size, size)),
+                ]
+            )
+            self.offset = 0
+        uniforms = self.block[self.offset : self.offset + size]
+        self.offset += size
+        return uniforms
+
+    def uniform(self) -> float:
+        return float(self.uniforms(1)[0])
+
+    def integers(self, low: int, high: int = None, size: int = None):
+        """
+        Integers in [low, high), or in [0, low) if high is not given, like Generator.integers.
+        """
+        if high is None:
+            low, high = 0, low
+        if size is None:
+            return int(low + self.uniform() * (high - low))
+        return (low + self.uniforms(size) * (high - low)).astype(np.int64)
+
+    def choice(self, sequence: Sequence[T]) -> T:
+        return sequence[self.integers(len(sequence))]
+
+
+# shared by the whole game
+rng = RandomNumbers()
@@ -9,10 +9,43 @@ PLAYER_ATTACK_RADIUS = float(os.getenv("PLAYER_ATTACK_RADIUS"))
 PLAYER_MEASURE_TIME = int(os.getenv("PLAYER_MEASURE_TIME"))
 # ghost stats
 MAX_GHOSTS_PER_STATE = int(os.getenv("MAX_GHOSTS_PER_STATE"))
+# a QGhost stops splitting once it has this many visible parts
+MAX_GHOST_PARTS = int(os.getenv("MAX_GHOST_PARTS", MAX_GHOSTS_PER_STATE))
 GHOST_SPEED = float(os.getenv("GHOST_SPEED"))
 GHOST_ATTACK_RADIUS = float(os.getenv("GHOST_ATTACK_RADIUS"))
 PROB_GHOST_ATTACK = float(os.getenv("PROB_GHOST_ATTACK"))
 PROB_GHOST_TRAP = float(os.getenv("PROB_GHOST_TRAP"))
+# ghosts chase the player and go to splitters around the walls instead of in a straight line
+GHOST_FLOW_FIELDS = os.getenv("GHOST_FLOW_FIELDS", "False").lower() in ("1", "true")
+# quantum state simulation: "fock", "mps", "numpy" or "qutip" (needs qutip installed),
+# for the states holding more than one ghost
+QUANTUM_BACKEND = os.getenv("QUANTUM_BACKEND", "fock")
+# states holding exactly one ghost, as every QGhost does, are stored as a plain vector
+# of amplitudes whatever QUANTUM_BACKEND is, False to use QUANTUM_BACKEND for them too
+SINGLE_GHOST_FAST_PATH = os.getenv("SINGLE_GHOST_FAST_PATH", "True").lower() in (
+    "1",
+    "true",
+)
+# bonds of the "mps" backend are truncated to this dimension
+MPS_MAX_BOND_DIMENSION = int(os.getenv("MPS_MAX_BOND_DIMENSION", 32))
+# amplitudes with a smaller probability are dropped, and so are the visible parts
+# of a QGhost that are empty with probability larger than 1 - QUANTUM_PRUNE_EPSILON
+QUANTUM_PRUNE_EPSILON = float(os.getenv("QUANTUM_PRUNE_EPSILON", 1e-9))
+# number of expanded beam-splitter operators kept in memory by each backend
+BEAM_SPLITTER_CACHE_SIZE = int(os.getenv("BEAM_SPLITTER_CACHE_SIZE", 128))
+# seed of the random numbers of the game, empty for a different game every time
+RANDOM_SEED = int(os.getenv("RANDOM_SEED")) if os.getenv("RANDOM_SEED") else None
+# number of uniform random numbers drawn at the start of every tick
+RNG_BLOCK_SIZE = int(os.getenv("RNG_BLOCK_SIZE", 256))
+# the levels are updated this many times per second
+TICKS_PER_SECOND = int(os.getenv("TICKS_PER_SECOND", 60))
+# after a slow frame, at most this many ticks are played to catch up, the rest is dropped
+MAX_TICKS_PER_FRAME = int(os.getenv("MAX_TICKS_PER_FRAME", 5))
+# the game is rendered at most this many times per second, independently of the ticks
+FRAMES_PER_SECOND = int(os.getenv("FRAMES_PER_SECOND", 60))
+# the games are recorded in this folder, to be replayed with src/Simulation/replay.py,
+# empty not to record them
+RECORDINGS_FOLDER = os.getenv("RECORDINGS_FOLDER", "")
 # the difficulty impacts attack and trap laying probability,
 # multiplying them my difficulty/max_difficulty
 MAX_DIFFICULTY = int(os.getenv("MAX_DIFFICULTY"))